@@ -0,0 +1,280 @@
+"""
+Массовая рассылка сообщений с учетом лимитов Telegram
+Общий token bucket (~30 сообщений в секунду), не чаще 1 сообщения в секунду в один чат,
+ограниченный пул параллельных отправителей и пауза при TelegramRetryAfter
+Для чатов в режиме live сообщение редактируется вместо отправки нового.
+Пользователи, заблокировавшие бота или удалившие чат, отмечаются неактивными
+и больше не попадают в выборку подписчиков.
+"""
+
+import asyncio
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+
+from database.connect import async_session
+from database.services.user import User
+from loader import bot as default_bot
+from utils.logging import logger
+from utils.metrics import metrics
+from utils.priority_session import low_priority
+
+# Лимиты Telegram
+GLOBAL_RATE: float = 30  # сообщений в секунду на бота
+CHAT_INTERVAL: float = 1  # секунд между сообщениями в один чат
+WORKERS: int = 20  # параллельных отправителей
+MAX_ATTEMPTS: int = 3  # попыток отправки при TelegramRetryAfter
+
+# Ошибки, после которых в чат больше нет смысла писать
+CHAT_NOT_FOUND = "chat not found"
+
+
+class ChatUnavailable(Exception):
+    """Бот заблокирован пользователем, исключен из чата или чат не найден"""
+
+
+class TokenBucket:
+    """Асинхронный token bucket на монотонных часах"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Скорость пополнения (токенов в секунду)
+            capacity: Максимальный запас токенов (по умолчанию равен rate)
+        """
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Останавливает выдачу токенов (например, после TelegramRetryAfter)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._updated = self._paused_until
+        self._tokens = 0
+
+    async def acquire(self) -> None:
+        """Ждет и забирает один токен"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BroadcastReport:
+    """Итоги одной рассылки"""
+
+    __slots__ = (
+        "total",
+        "sent",
+        "failed",
+        "retried",
+        "edited",
+        "failed_ids",
+        "blocked_ids",
+        "message_ids",
+        "started",
+        "finished",
+    )
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.edited = 0
+        self.failed_ids: List[int] = []
+        # Чаты, которые заблокировали бота или не существуют (входят и в failed_ids)
+        self.blocked_ids: List[int] = []
+        # Сообщения live-чатов после рассылки: {chat_id: message_id}
+        self.message_ids: Dict[int, int] = {}
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def __repr__(self):
+        return (
+            f"<BroadcastReport total={self.total} sent={self.sent} failed={self.failed} "
+            f"retried={self.retried} edited={self.edited} blocked={len(self.blocked_ids)} "
+            f"duration={self.duration:.1f}s>"
+        )
+
+
+class Broadcaster:
+    """Рассыльщик сообщений пользователям"""
+
+    def __init__(
+        self,
+        bot: Bot = default_bot,
+        rate: float = GLOBAL_RATE,
+        chat_interval: float = CHAT_INTERVAL,
+        workers: int = WORKERS,
+    ):
+        self.bot = bot
+        self.bucket = TokenBucket(rate)
+        self.chat_interval = chat_interval
+        self.workers = workers
+        # Время последней отправки в чат: {chat_id: monotonic}
+        self._chat_last_sent: dict[int, float] = {}
+
+    async def broadcast(
+        self,
+        messages: Iterable[Tuple[int, str]],
+        live: Optional[Mapping[int, Optional[int]]] = None,
+    ) -> BroadcastReport:
+        """
+        Рассылает сообщения и ждет завершения
+
+        Args:
+            messages: Пары (chat_id, text)
+            live: Чаты в режиме live: {chat_id: message_id для редактирования или None}
+
+        Returns:
+            Отчет о рассылке
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for message in messages:
+            queue.put_nowait(message)
+
+        report = BroadcastReport(total=queue.qsize())
+        if not report.total:
+            report.finished = time.monotonic()
+            return report
+
+        # Рассылка уступает общий лимит запросов ответам пользователям
+        with low_priority():
+            workers = [
+                asyncio.create_task(self._worker(queue, report, live or {}))
+                for _ in range(min(self.workers, report.total))
+            ]
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        self._cleanup_chats()
+        report.finished = time.monotonic()
+        logger.log("MAILING", f"Рассылка завершена: {report}")
+
+        if report.blocked_ids:
+            await self._deactivate(report.blocked_ids)
+        return report
+
+    @staticmethod
+    async def _deactivate(chat_ids: List[int]) -> None:
+        """Исключает недоступные чаты из следующих рассылок (одним запросом)"""
+        try:
+            async with async_session() as session:
+                deactivated = await User.deactivate_many(session, chat_ids)
+            metrics.inc("users_deactivated", deactivated)
+            logger.log("MAILING", f"Неактивными отмечено {deactivated} пользователей")
+        except Exception as e:
+            logger.error(f"Ошибка при отметке неактивных пользователей: {e}")
+
+    async def _worker(
+        self, queue: asyncio.Queue, report: BroadcastReport, live: Mapping[int, Optional[int]]
+    ) -> None:
+        while True:
+            chat_id, text = await queue.get()
+            try:
+                message_id = await self._send(chat_id, text, report, live.get(chat_id))
+                if message_id is not None:
+                    report.sent += 1
+                    if chat_id in live:
+                        report.message_ids[chat_id] = message_id
+                else:
+                    report.failed += 1
+                    report.failed_ids.append(chat_id)
+            except ChatUnavailable:
+                report.failed += 1
+                report.failed_ids.append(chat_id)
+                report.blocked_ids.append(chat_id)
+            finally:
+                queue.task_done()
+
+    async def _send(
+        self, chat_id: int, text: str, report: BroadcastReport, edit_id: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Отправляет сообщение или редактирует {edit_id}
+
+        Returns:
+            id доставленного сообщения или None при ошибке
+
+        Raises:
+            ChatUnavailable: Бот заблокирован или чат не найден
+        """
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            await self._wait_chat(chat_id)
+            await self.bucket.acquire()
+            self._chat_last_sent[chat_id] = time.monotonic()
+
+            try:
+                if edit_id:
+                    await self.bot.edit_message_text(
+                        text=text, chat_id=chat_id, message_id=edit_id, parse_mode="HTML"
+                    )
+                    report.edited += 1
+                    return edit_id
+                message = await self.bot.send_message(
+                    chat_id=chat_id, text=text, parse_mode="HTML"
+                )
+                return message.message_id
+            except TelegramRetryAfter as e:
+                logger.warning(f"Flood control, пауза рассылки на {e.retry_after} с")
+                self.bucket.pause(e.retry_after)
+                report.retried += 1
+            except TelegramForbiddenError as e:
+                raise ChatUnavailable(chat_id) from e
+            except TelegramBadRequest as e:
+                if CHAT_NOT_FOUND in e.message.lower():
+                    raise ChatUnavailable(chat_id) from e
+                if edit_id and "message is not modified" in e.message:
+                    return edit_id
+                if edit_id:
+                    # Сообщение удалено или его уже нельзя редактировать - отправляем новое
+                    edit_id = None
+                    continue
+                logger.error(f"Ошибка отправки уведомления пользователю {chat_id}: {e}")
+                return None
+            except Exception as e:
+                logger.error(f"Ошибка отправки уведомления пользователю {chat_id}: {e}")
+                return None
+
+        return None
+
+    async def _wait_chat(self, chat_id: int) -> None:
+        """Выдерживает интервал между сообщениями в один чат"""
+        if last := self._chat_last_sent.get(chat_id):
+            delay = last + self.chat_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def _cleanup_chats(self) -> None:
+        """Удаляет чаты, интервал для которых уже истек"""
+        border = time.monotonic() - self.chat_interval
+        self._chat_last_sent = {
+            chat_id: last for chat_id, last in self._chat_last_sent.items() if last > border
+        }
+
+
+# Общий рассыльщик для мониторов расписания
+broadcaster = Broadcaster()
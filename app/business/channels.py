@@ -0,0 +1,45 @@
+"""
+Каналы групп
+Если у группы настроен канал (GROUP_CHANNELS), изменение расписания публикуется
+в нем одним сообщением, а в личные сообщения уходит только тем подписчикам,
+которые от канала отказались (is_dm_alerts).
+"""
+
+from typing import Dict, Mapping, Optional
+
+from data.config import tgbot
+from utils.logging import logger
+
+
+class GroupChannels:
+    """Каналы групп и ссылки для вступления в них"""
+
+    def __init__(self, channels: Mapping[float, int], links: Mapping[float, str]):
+        self._channels: Dict[float, int] = {}
+        self._links: Dict[float, str] = {}
+        for group, chat_id in channels.items():
+            # Без ссылки пользователи не смогут вступить в канал - оставляем им личные сообщения
+            if not (link := links.get(group)):
+                logger.warning(f"Для канала группы {group} не указана ссылка, он не используется")
+                continue
+            self._channels[group] = chat_id
+            self._links[group] = link
+
+    def get(self, group: Optional[float]) -> Optional[int]:
+        """id канала группы или None"""
+        return self._channels.get(group)
+
+    def link(self, group: Optional[float]) -> Optional[str]:
+        """Ссылка для вступления в канал группы или None"""
+        return self._links.get(group)
+
+    @property
+    def groups(self) -> frozenset:
+        """Группы, у которых есть канал"""
+        return frozenset(self._channels)
+
+    def __bool__(self) -> bool:
+        return bool(self._channels)
+
+
+group_channels = GroupChannels(tgbot.GROUP_CHANNELS, tgbot.GROUP_CHANNEL_LINKS)
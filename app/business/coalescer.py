@@ -0,0 +1,247 @@
+"""
+Объединение уведомлений о частых исправлениях расписания
+Изменения одной группы в пределах окна (NOTIFY_COALESCE_WINDOW) превращаются в одно
+уведомление с итоговым расписанием. Окно продлевается каждым новым изменением,
+но не дольше MAX_DELAY_FACTOR окон с первого изменения.
+Каждое новое изменение группы отменяет ее еще не отправленные сообщения в outbox.
+Отложенные группы сохраняются в БД до постановки в очередь: после перезапуска
+(или смены лидера) окно продолжается, уведомление не теряется.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Mapping, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.business.outbox import outbox
+from data.config import tgbot
+from database.connect import async_session
+from database.services.schedule_state import ScheduleState
+from utils.logging import logger
+from utils.metrics import delivery_tracker, metrics
+from utils.schedule_store import ScheduleSnapshot, schedule_store
+
+# Максимальная задержка уведомления в окнах
+MAX_DELAY_FACTOR: int = 3
+# Через сколько секунд повторить постановку в очередь после ошибки
+RETRY_DELAY: float = 30
+
+STATE_NAME = "coalescer"
+
+# Постановка уведомлений в очередь: (сессия, группы, снимок) -> количество сообщений
+SendCallback = Callable[[AsyncSession, Set[str], ScheduleSnapshot], Awaitable[int]]
+
+
+class PendingChange:
+    """Отложенное уведомление группы"""
+
+    __slots__ = ("first_seen", "last_seen", "changed_at", "baseline", "merged")
+
+    def __init__(self, now: float, changed_at: Optional[datetime], baseline: Optional[tuple]):
+        # Время (unix) первого и последнего изменения - переживает перезапуск
+        self.first_seen = now
+        self.last_seen = now
+        # Время первого изменения в источнике (для метрики задержки доставки)
+        self.changed_at = changed_at
+        # (день, маски), о которых пользователи знают с прошлого уведомления
+        self.baseline = baseline
+        self.merged = 0
+
+    def dump(self) -> list:
+        changed_at = self.changed_at.isoformat() if self.changed_at else None
+        return [self.first_seen, self.last_seen, changed_at, self.baseline, self.merged]
+
+    @classmethod
+    def load(cls, raw: list) -> "PendingChange":
+        first_seen, last_seen, changed_at, baseline, merged = raw
+        pending = cls(
+            first_seen,
+            datetime.fromisoformat(changed_at) if changed_at else None,
+            (baseline[0], tuple(baseline[1])) if baseline else None,
+        )
+        pending.last_seen = last_seen
+        pending.merged = merged
+        return pending
+
+
+class NotificationCoalescer:
+    """Окно объединения между сравнением расписаний и очередью отправки"""
+
+    def __init__(
+        self,
+        send: SendCallback,
+        window: float = tgbot.NOTIFY_WINDOW,
+        max_delay: Optional[float] = None,
+    ):
+        self.send = send
+        self.window = window
+        self.max_delay = window * MAX_DELAY_FACTOR if max_delay is None else max_delay
+        self._pending: Dict[str, PendingChange] = {}
+        self._timer: Optional[asyncio.Task] = None
+        self._restored = False
+
+    async def restore(self, session: AsyncSession) -> None:
+        """Загружает отложенные группы, сохраненные до перезапуска (один раз)"""
+        if self._restored:
+            return
+        self._restored = True
+        if not (payload := await ScheduleState.load(session, STATE_NAME)):
+            return
+
+        restored = {group: PendingChange.load(raw) for group, raw in json.loads(payload).items()}
+        for group, pending in restored.items():
+            self._pending.setdefault(group, pending)
+        if restored:
+            logger.log("SCHEDULE", f"Восстановлены отложенные уведомления {len(restored)} групп")
+            self._arm()
+
+    async def _persist(self, session: AsyncSession) -> None:
+        payload = {group: pending.dump() for group, pending in self._pending.items()}
+        await ScheduleState.save(session, STATE_NAME, json.dumps(payload))
+
+    async def add(
+        self,
+        session: AsyncSession,
+        groups: Set[str],
+        snapshot: ScheduleSnapshot,
+        baselines: Optional[Mapping[str, Optional[tuple]]] = None,
+    ) -> int:
+        """
+        Принимает изменившиеся группы
+
+        Args:
+            session: Сессия БД
+            groups: Ключи изменившихся групп
+            snapshot: Снимок с изменениями
+            baselines: Предыдущие маски групп {группа: (день, (off, uncertain))}
+
+        Returns:
+            Количество сообщений, поставленных в очередь сразу (без окна)
+        """
+        # Неотправленные сообщения о прошлых версиях больше не актуальны
+        if cancelled := await outbox.cancel_superseded(groups, snapshot.version):
+            metrics.inc("notifications_cancelled", cancelled)
+            logger.log("SCHEDULE", f"Отменено {cancelled} устаревших уведомлений")
+
+        if not self.window:
+            return await self._deliver(session, set(groups), snapshot, snapshot.updated_at)
+
+        now = time.time()
+        baselines = baselines or {}
+        for group in groups:
+            if pending := self._pending.get(group):
+                pending.last_seen = now
+                pending.merged += 1
+            else:
+                self._pending[group] = PendingChange(
+                    now, snapshot.updated_at, baselines.get(group)
+                )
+
+        # Сохраняется до того, как монитор запомнит новую версию как обработанную
+        await self._persist(session)
+        self._arm()
+        logger.log("SCHEDULE", f"Уведомления отложены для {len(self._pending)} групп")
+        return 0
+
+    def _due(self, pending: PendingChange) -> float:
+        return min(pending.last_seen + self.window, pending.first_seen + self.max_delay)
+
+    def _arm(self, min_delay: float = 0) -> None:
+        """Перезапускает таймер до ближайшего срока отправки"""
+        timer = self._timer
+        if timer is not None and timer is not asyncio.current_task() and not timer.done():
+            timer.cancel()
+        if self._pending:
+            due = min(self._due(pending) for pending in self._pending.values())
+            self._timer = asyncio.create_task(self._wait(max(due - time.time(), min_delay)))
+
+    async def _wait(self, delay: float) -> None:
+        await asyncio.sleep(max(delay, 0))
+        await self.flush()
+
+    async def flush(self, force: bool = False) -> int:
+        """
+        Ставит в очередь уведомления групп, окно которых закрылось
+
+        Args:
+            force: Отправить все отложенные уведомления (например, при остановке)
+
+        Returns:
+            Количество сообщений в очереди
+        """
+        now = time.time()
+        due = {
+            group: pending
+            for group, pending in self._pending.items()
+            if force or self._due(pending) <= now
+        }
+        snapshot = schedule_store.get()
+        if not due or snapshot is None:
+            self._arm()
+            return 0
+
+        for group in due:
+            del self._pending[group]
+
+        try:
+            added = await self._flush_groups(due, snapshot)
+        except Exception as e:
+            # Группы остаются отложенными (и в БД), постановка повторится позже
+            logger.error(f"Ошибка при отправке отложенных уведомлений: {e}")
+            for group, pending in due.items():
+                self._pending.setdefault(group, pending)
+            self._arm(RETRY_DELAY)
+            return 0
+
+        self._arm()
+        return added
+
+    async def _flush_groups(
+        self, due: Dict[str, PendingChange], snapshot: ScheduleSnapshot
+    ) -> int:
+        groups = set()
+        for group, pending in due.items():
+            # Расписание вернулось к тому, о котором уже сообщали - уведомлять не о чем
+            if pending.baseline is not None and pending.baseline == _current(snapshot, group):
+                metrics.inc("notifications_reverted")
+                continue
+            groups.add(group)
+
+        merged = sum(pending.merged for pending in due.values())
+        if merged:
+            metrics.inc("notifications_coalesced", merged)
+        logger.log(
+            "SCHEDULE",
+            f"Окно уведомлений закрыто: {len(groups)} групп, объединено изменений {merged}",
+        )
+
+        changed_at = min(
+            (due[group].changed_at for group in groups if due[group].changed_at), default=None
+        )
+        async with async_session() as session:
+            added = await self._deliver(session, groups, snapshot, changed_at) if groups else 0
+            # Сообщения уже в outbox (повторная постановка отбрасывается по ключу),
+            # теперь группы можно убрать из сохраненного состояния
+            await self._persist(session)
+        return added
+
+    async def _deliver(
+        self,
+        session: AsyncSession,
+        groups: Set[str],
+        snapshot: ScheduleSnapshot,
+        changed_at: Optional[datetime],
+    ) -> int:
+        added = await self.send(session, groups, snapshot)
+        if added:
+            metrics.inc("schedule_notifications_queued", added)
+            delivery_tracker.track(snapshot.version, changed_at)
+        return added
+
+
+def _current(snapshot: ScheduleSnapshot, group: str) -> Tuple[Optional[int], Optional[tuple]]:
+    schedule = snapshot.get_group_day(group)
+    return snapshot.today, schedule.to_pair() if schedule else None
@@ -3,29 +3,33 @@
 Сравнивает текущее расписание с предыдущим и отправляет уведомления пользователям
 """
 
-import asyncio
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, Optional, Set
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.business.channels import group_channels
+from app.business.coalescer import NotificationCoalescer
+from app.business.outbox import OutboxMessage, outbox, outbox_worker
 from data.config import DIR
-from database.models.user import UserModel
-from loader import bot
+from database.services.schedule_state import ScheduleState
+from database.services.user import User
 from utils.github_schedule import (
     EMOJI_BULB,
     EMOJI_FLASH,
     SEPARATOR_THICK,
-    download_schedule_from_github,
     format_schedule_text,
-    get_schedule,
-    parse_group_number,
+    get_schedule_snapshot,
 )
 from utils.logging import logger
+from utils.schedule_bits import SLOTS, DaySchedule
+from utils.schedule_store import ScheduleSnapshot
 
-# Путь к файлу с предыдущим расписанием для сравнения
+# Маски последней обработанной версии хранятся в БД, общей для всех инстансов:
+# новый лидер сравнивает с тем же расписанием, что и прежний
+STATE_NAME = "github_monitor"
+# Файл, в котором маски хранились раньше (читается, пока в БД ничего нет)
 PREVIOUS_SCHEDULE_FILE = Path(DIR) / "data" / "previous_schedule_github.json"
 
 
@@ -34,146 +38,192 @@ class GitHubScheduleMonitor:
 
     def __init__(self):
         self.previous_file = PREVIOUS_SCHEDULE_FILE
-        # Создаем директорию если не существует
-        self.previous_file.parent.mkdir(parents=True, exist_ok=True)
+        # Частые исправления одной группы объединяются в одно уведомление
+        self.coalescer = NotificationCoalescer(self._send_notifications)
 
-    async def check_and_notify(self, session: AsyncSession) -> None:
+    async def check_and_notify(
+        self, session: AsyncSession, snapshot: Optional[ScheduleSnapshot] = None
+    ) -> int:
         """
         Проверяет расписание на изменения и отправляет уведомления
 
         Args:
             session: Сессия БД для получения пользователей
+            snapshot: Снимок для сравнения (по умолчанию текущий из памяти)
+
+        Returns:
+            Количество уведомлений, поставленных в очередь сразу
+            (при включенном окне объединения уведомления ставятся позже)
         """
+        added = 0
         try:
             logger.log("SCHEDULE", "Начинаю проверку расписания GitHub")
 
-            # Получаем текущее расписание
-            current_data = get_schedule()
+            # Получаем текущий снимок расписания (с масками, посчитанными при загрузке)
+            snapshot = snapshot or get_schedule_snapshot()
 
-            if not current_data:
+            if not snapshot:
                 logger.error("Не удалось получить текущее расписание из GitHub")
-                return
+                return added
 
-            # Загружаем предыдущее расписание
-            previous_data = self._load_previous_schedule()
+            # Отложенные до перезапуска уведомления продолжают ждать окна
+            await self.coalescer.restore(session)
 
-            # Если это первый запуск - просто сохраняем расписание
-            if not previous_data:
-                self._save_schedule(current_data)
+            # Загружаем маски предыдущего расписания
+            previous_index = await self._load_previous_schedule(session)
+
+            # Если это первый запуск - просто сохраняем маски
+            if not previous_index:
+                await self._save_schedule(session, snapshot)
                 logger.log("SCHEDULE", "Первое сохранение расписания GitHub")
-                return
+                return added
 
-            # Сравниваем расписания
-            changed_groups = self._compare_schedules(previous_data, current_data)
+            # Документ не изменился целиком - дальше сравнивать нечего
+            if previous_index.get("version") == snapshot.version:
+                logger.log("SCHEDULE", "Изменений в расписании GitHub не обнаружено")
+                return added
+
+            # Сравниваем маски групп
+            changed_groups = self._compare_schedules(previous_index, snapshot)
 
             if changed_groups:
                 logger.log("SCHEDULE", f"Обнаружены изменения в {len(changed_groups)} группах")
-                await self._send_notifications(session, changed_groups, current_data)
-
-                # Сохраняем новое расписание
-                self._save_schedule(current_data)
+                added = await self.coalescer.add(
+                    session,
+                    changed_groups,
+                    snapshot,
+                    baselines=self._baselines(previous_index, changed_groups, snapshot),
+                )
             else:
-                logger.log("SCHEDULE", "Изменений в расписании GitHub не обнаружено")
+                logger.log("SCHEDULE", "Изменений в расписании GitHub на сегодня не обнаружено")
+
+            # Сохраняем маски новой версии
+            await self._save_schedule(session, snapshot)
 
         except Exception as e:
             logger.error(f"Ошибка при проверке расписания GitHub: {e}")
 
-    def _compare_schedules(self, previous_data: Dict, current_data: Dict) -> Set[str]:
+        return added
+
+    def _compare_schedules(self, previous_index: Dict, snapshot: ScheduleSnapshot) -> Set[str]:
         """
-        Сравнивает два расписания и возвращает группы с изменениями
+        Сравнивает маски двух расписаний и возвращает группы с изменениями
 
         Args:
-            previous_data: Предыдущее расписание
-            current_data: Текущее расписание
+            previous_index: Маски предыдущего расписания
+            snapshot: Текущий снимок расписания
 
         Returns:
             Множество ключей групп с изменениями (например, {"GPV3.1", "GPV5.2"})
         """
         changed_groups = set()
 
-        # Получаем данные фактов
-        prev_fact = previous_data.get("fact", {}).get("data", {})
-        curr_fact = current_data.get("fact", {}).get("data", {})
-
         # Получаем текущий день
-        today = current_data.get("fact", {}).get("today")
+        today = snapshot.today
 
         if not today:
             logger.warning("Не удалось определить текущий день")
             return changed_groups
 
         # Сравниваем расписания на сегодняшнюю дату
-        today_str = str(today)
-        prev_today = prev_fact.get(today_str, {})
-        curr_today = curr_fact.get(today_str, {})
+        prev_today = previous_index.get("masks", {}).get(str(today), {})
+        curr_today = snapshot.days.get(int(today), {})
 
-        # Проверяем каждую группу
+        # Проверяем каждую группу: XOR масок, число изменений - popcount
         all_groups = set(prev_today.keys()) | set(curr_today.keys())
 
         for group_key in all_groups:
-            prev_schedule = prev_today.get(group_key, {})
-            curr_schedule = curr_today.get(group_key, {})
+            previous = prev_today.get(group_key)
+            current = curr_today.get(group_key)
+
+            if previous is None or current is None:
+                changed_slots = SLOTS
+            else:
+                changed_slots = current.changed_slots(DaySchedule(*previous))
 
-            # Сравниваем расписания
-            if prev_schedule != curr_schedule:
+            if changed_slots:
                 changed_groups.add(group_key)
-                logger.log("SCHEDULE", f"Изменение обнаружено в группе {group_key}")
+                logger.log(
+                    "SCHEDULE",
+                    f"Изменение обнаружено в группе {group_key} ({changed_slots / 2:g} год)",
+                )
 
         return changed_groups
 
+    @staticmethod
+    def _baselines(
+        previous_index: Dict, groups: Set[str], snapshot: ScheduleSnapshot
+    ) -> Dict[str, tuple]:
+        """Маски групп на сегодня, которые были до изменения: {группа: (день, (off, uncertain))}"""
+        prev_today = previous_index.get("masks", {}).get(str(snapshot.today), {})
+        return {
+            group: (snapshot.today, tuple(prev_today[group]))
+            for group in groups
+            if group in prev_today
+        }
+
     async def _send_notifications(
-        self, session: AsyncSession, changed_groups: Set[str], current_data: Dict
-    ) -> None:
+        self, session: AsyncSession, changed_groups: Set[str], snapshot: ScheduleSnapshot
+    ) -> int:
         """
-        Отправляет уведомления пользователям об изменениях расписания
+        Ставит уведомления об изменениях расписания в очередь на отправку
 
         Args:
             session: Сессия БД
             changed_groups: Множество ключей измененных групп
-            current_data: Текущие данные расписания
+            snapshot: Текущий снимок расписания
+
+        Returns:
+            Количество новых сообщений в очереди
         """
+        # Извлекаем номера групп из ключей (например, "GPV3.1" -> 3.1)
+        group_numbers = {}
         for group_key in changed_groups:
-            try:
-                # Извлекаем номер группы из ключа (например, "GPV3.1" -> 3.1)
-                group_number = self._extract_group_number(group_key)
+            if group_number := self._extract_group_number(group_key):
+                group_numbers[group_key] = group_number
+            else:
+                logger.warning(f"Не удалось извлечь номер группы из '{group_key}'")
 
-                if not group_number:
-                    logger.warning(f"Не удалось извлечь номер группы из '{group_key}'")
-                    continue
+        # Получаем подписчиков всех измененных групп одним запросом
+        # (в группах с каналом - только тех, кто просит личные сообщения)
+        subscribers = await User.get_subscribers_by_groups(
+            session, group_numbers.values(), channel_groups=group_channels.groups
+        )
 
-                # Получаем пользователей этой группы с включенными уведомлениями
-                users = await self._get_users_with_alerts(session, group_number)
+        messages = []
 
-                if not users:
+        for group_key, group_number in group_numbers.items():
+            try:
+                users = subscribers.get(group_number, [])
+                channel_id = group_channels.get(group_number)
+
+                if not users and channel_id is None:
                     logger.log(
                         "SCHEDULE", f"Нет пользователей с уведомлениями для группы {group_key}"
                     )
                     continue
 
-                # Формируем текст уведомления
-                notification_text = self._format_notification(group_key, current_data)
-
-                # Отправляем уведомления всем пользователям
-                sent_count = 0
-                for user in users:
-                    try:
-                        await bot.send_message(
-                            chat_id=user.id, text=notification_text, parse_mode="HTML"
-                        )
-                        sent_count += 1
-                        # Небольшая задержка между отправками
-                        await asyncio.sleep(0.05)
-                    except Exception as e:
-                        logger.error(f"Ошибка отправки уведомления пользователю {user.id}: {e}")
-
-                logger.log(
-                    "SCHEDULE",
-                    f"Отправлено {sent_count} уведомлений для группы {group_key}",
+                # Формируем текст уведомления (один на группу)
+                notification_text = self._format_notification(group_key, snapshot.data)
+                # Канал получает одно сообщение вместо рассылки по подписчикам
+                if channel_id is not None:
+                    messages.append(
+                        OutboxMessage(channel_id, group_key, snapshot.version, notification_text)
+                    )
+                messages.extend(
+                    OutboxMessage(user_id, group_key, snapshot.version, notification_text)
+                    for user_id, _ in users
                 )
 
             except Exception as e:
                 logger.error(f"Ошибка при обработке группы {group_key}: {e}")
 
+        # Сохраняем уведомления в очередь, отправкой занимается outbox воркер
+        added = await outbox.append(messages)
+        outbox_worker.wake()
+        logger.log("SCHEDULE", f"В очередь поставлено {added} уведомлений")
+        return added
+
     @staticmethod
     def _extract_group_number(group_key: str) -> Optional[float]:
         """
@@ -196,26 +246,6 @@ class GitHubScheduleMonitor:
                 return None
         return None
 
-    @staticmethod
-    async def _get_users_with_alerts(session: AsyncSession, group_number: float) -> List[UserModel]:
-        """
-        Получает пользователей группы с включенными уведомлениями
-
-        Args:
-            session: Сессия БД
-            group_number: Номер группы
-
-        Returns:
-            Список пользователей
-        """
-        stmt = (
-            select(UserModel)
-            .where(UserModel.group == group_number)
-            .where(UserModel.is_alerts == True)
-        )
-        result = await session.execute(stmt)
-        return list(result.scalars().all())
-
     def _format_notification(self, group_key: str, current_data: Dict) -> str:
         """
         Форматирует текст уведомления об изменении расписания
@@ -270,13 +300,21 @@ class GitHubScheduleMonitor:
 
         return text
 
-    def _load_previous_schedule(self) -> Optional[Dict]:
+    async def _load_previous_schedule(self, session: AsyncSession) -> Optional[Dict]:
         """
-        Загружает предыдущее сохраненное расписание
+        Загружает маски предыдущего сохраненного расписания
+        Ошибка чтения БД не глушится: иначе монитор принял бы ее за первый запуск
+        и молча пропустил изменения
 
         Returns:
-            Словарь с предыдущим расписанием или None
+            Словарь {"version", "today", "masks"} или None
         """
+        if (payload := await ScheduleState.load(session, STATE_NAME)) is not None:
+            return json.loads(payload)
+        return self._load_previous_file()
+
+    def _load_previous_file(self) -> Optional[Dict]:
+        """Маски из файла, в котором они хранились до переноса в БД"""
         try:
             if not self.previous_file.exists():
                 return None
@@ -284,28 +322,51 @@ class GitHubScheduleMonitor:
             with open(self.previous_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
 
-            return data
+            if "masks" in data:
+                return data
+
+            # Старый формат файла - полная копия расписания
+            if "fact" in data:
+                return self._build_index(ScheduleSnapshot(data))
+
+            # Индекс хешей (прежний формат) с масками не сравнить - начинаем заново
+            logger.log("SCHEDULE", "Индекс предыдущего расписания в старом формате, пересоздаю")
+            return None
 
         except Exception as e:
             logger.error(f"Ошибка при загрузке предыдущего расписания: {e}")
             return None
 
-    def _save_schedule(self, data: Dict) -> None:
+    async def _save_schedule(self, session: AsyncSession, snapshot: ScheduleSnapshot) -> None:
         """
-        Сохраняет расписание для последующего сравнения
+        Сохраняет маски расписания для последующего сравнения
 
         Args:
-            data: Данные расписания для сохранения
+            session: Сессия БД
+            snapshot: Снимок расписания
         """
         try:
-            with open(self.previous_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            payload = json.dumps(self._build_index(snapshot), separators=(",", ":"))
+            await ScheduleState.save(session, STATE_NAME, payload)
 
-            logger.log("SCHEDULE", "Расписание GitHub сохранено для последующего сравнения")
+            logger.log("SCHEDULE", "Маски расписания GitHub сохранены для сравнения")
 
         except Exception as e:
+            await session.rollback()
             logger.error(f"Ошибка при сохранении расписания: {e}")
 
+    @staticmethod
+    def _build_index(snapshot: ScheduleSnapshot) -> Dict:
+        """Компактный индекс снимка: маски (off, uncertain) каждой группы на каждый день"""
+        return {
+            "version": snapshot.version,
+            "today": snapshot.today,
+            "masks": {
+                str(day): {group_key: schedule.to_pair() for group_key, schedule in groups.items()}
+                for day, groups in snapshot.days.items()
+            },
+        }
+
 
 # Создаем экземпляр монитора
 github_schedule_monitor = GitHubScheduleMonitor()
@@ -0,0 +1,233 @@
+"""
+Выбор лидера между инстансами бота.
+Проверку изменений и рассылку выполняет только лидер, остальные инстансы
+обслуживают пользователей и обновляют расписание в памяти.
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable
+
+from sqlalchemy import text
+
+from database.connect import async_engine
+from loader import redis_client
+from utils.logging import logger
+
+# Время жизни аренды: за столько секунд последователь заменит упавшего лидера
+LEASE_TTL: float = 10
+# Как часто лидер продлевает аренду, а последователи пробуют ее захватить
+RENEW_INTERVAL: float = 3
+
+LEASE_KEY = "leader:schedule"
+# Произвольный идентификатор advisory-блокировки PostgreSQL
+ADVISORY_LOCK_ID = 7_301_622_018
+
+# Продление и освобождение только своей аренды
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLease:
+    """Аренда в Redis: ключ с TTL, значение - токен владельца"""
+
+    def __init__(self, redis, key: str = LEASE_KEY, ttl: float = LEASE_TTL):
+        self.redis = redis
+        self.key = key
+        self.ttl_ms = int(ttl * 1000)
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._renew = redis.register_script(RENEW_SCRIPT)
+        self._release = redis.register_script(RELEASE_SCRIPT)
+
+    async def acquire(self) -> bool:
+        return bool(await self.redis.set(self.key, self.token, nx=True, px=self.ttl_ms))
+
+    async def renew(self) -> bool:
+        return bool(await self._renew(keys=[self.key], args=[self.token, self.ttl_ms]))
+
+    async def release(self) -> None:
+        await self._release(keys=[self.key], args=[self.token])
+
+
+class AdvisoryLock:
+    """
+    Сессионная advisory-блокировка PostgreSQL.
+    Держится, пока открыто соединение: при падении процесса сервер снимает ее сам.
+    """
+
+    def __init__(self, engine, lock_id: int = ADVISORY_LOCK_ID):
+        self.engine = engine
+        self.lock_id = lock_id
+        self._connection = None
+
+    async def acquire(self) -> bool:
+        connection = await self.engine.connect()
+        try:
+            locked = await connection.scalar(
+                text("SELECT pg_try_advisory_lock(:id)"), {"id": self.lock_id}
+            )
+            # Блокировка сессионная, транзакцию можно закрыть
+            await connection.commit()
+        except Exception:
+            await connection.close()
+            raise
+
+        if not locked:
+            await connection.close()
+            return False
+
+        self._connection = connection
+        return True
+
+    async def renew(self) -> bool:
+        """Проверяет, что соединение с блокировкой еще живо"""
+        if self._connection is None:
+            return False
+        try:
+            await self._connection.scalar(text("SELECT 1"))
+            await self._connection.commit()
+            return True
+        except Exception:
+            await self._drop_connection()
+            raise
+
+    async def release(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            await self._connection.scalar(
+                text("SELECT pg_advisory_unlock(:id)"), {"id": self.lock_id}
+            )
+            await self._connection.commit()
+        finally:
+            await self._drop_connection()
+
+    async def _drop_connection(self) -> None:
+        connection, self._connection = self._connection, None
+        try:
+            await connection.invalidate()
+            await connection.close()
+        except Exception:
+            pass
+
+
+class LocalLease:
+    """SQLite - бот работает в одном экземпляре, он всегда лидер"""
+
+    async def acquire(self) -> bool:
+        return True
+
+    async def renew(self) -> bool:
+        return True
+
+    async def release(self) -> None:
+        pass
+
+
+class LeaderElector:
+    """
+    Периодически захватывает или продлевает аренду.
+    Пока инстанс лидер, работают зарегистрированные задачи,
+    при потере лидерства они отменяются.
+    """
+
+    def __init__(self, lease, interval: float = RENEW_INTERVAL):
+        """
+        Args:
+            lease: RedisLease, AdvisoryLock или LocalLease
+            interval: Интервал продления/захвата аренды в секундах
+        """
+        self.lease = lease
+        self.interval = interval
+        self.is_leader = False
+        self._factories: list[Callable[[], Awaitable]] = []
+        self._tasks: list[asyncio.Task] = []
+        self._closed = False
+        # Устанавливается после первой попытки захватить аренду
+        self._decided = asyncio.Event()
+
+    def add_task(self, factory: Callable[[], Awaitable]) -> None:
+        """Регистрирует задачу, которая должна работать только на лидере"""
+        self._factories.append(factory)
+
+    async def run(self) -> None:
+        logger.log("BOT", f"Выбор лидера: {type(self.lease).__name__}")
+        while not self._closed:
+            try:
+                if self.is_leader:
+                    held = await self.lease.renew()
+                else:
+                    held = await self.lease.acquire()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка аренды лидера: {e}")
+                held = False
+
+            if held and not self.is_leader:
+                self._start_tasks()
+            elif not held and self.is_leader:
+                self._stop_tasks()
+                logger.log("BOT", "Инстанс потерял лидерство")
+
+            self._decided.set()
+            await asyncio.sleep(self.interval)
+
+    async def wait_decided(self, timeout: float = LEASE_TTL) -> bool:
+        """
+        Ждет первой попытки захватить аренду: до нее is_leader=False даже у будущего лидера
+
+        Returns:
+            Является ли инстанс лидером
+        """
+        try:
+            await asyncio.wait_for(self._decided.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Лидер не выбран за отведенное время")
+        return self.is_leader
+
+    async def resign(self) -> None:
+        """Останавливает задачи лидера и освобождает аренду (при завершении бота)"""
+        self._closed = True
+        if not self.is_leader:
+            return
+
+        self._stop_tasks()
+        try:
+            await self.lease.release()
+        except Exception as e:
+            logger.error(f"Ошибка освобождения аренды лидера: {e}")
+
+    def _start_tasks(self) -> None:
+        self.is_leader = True
+        self._tasks = [asyncio.create_task(factory()) for factory in self._factories]
+        logger.log("BOT", "Инстанс стал лидером: запущены фоновые задачи")
+
+    def _stop_tasks(self) -> None:
+        self.is_leader = False
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+
+def create_lease():
+    if redis_client is not None:
+        return RedisLease(redis_client)
+    if async_engine.dialect.name == "postgresql":
+        return AdvisoryLock(async_engine)
+    return LocalLease()
+
+
+leader = LeaderElector(create_lease())
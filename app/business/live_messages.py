@@ -0,0 +1,52 @@
+"""
+Режим live: вместо нового сообщения на каждое изменение расписания пользователю
+редактируется одно сообщение. Новое сообщение отправляется раз в день (для нового дня
+расписания) или если редактирование не удалось.
+"""
+
+from typing import Dict, Iterable, Optional
+
+from database.connect import async_session
+from database.services.live_message import LiveMessage
+from utils.metrics import metrics
+from utils.schedule_store import schedule_store
+
+
+class LiveMessages:
+    """Сообщения пользователей в режиме live"""
+
+    @staticmethod
+    def today() -> Optional[int]:
+        snapshot = schedule_store.get()
+        return int(snapshot.today) if snapshot and snapshot.today else None
+
+    async def resolve(self, user_ids: Iterable[int]) -> Dict[int, Optional[int]]:
+        """
+        Пользователи в режиме live среди {user_ids}
+
+        Returns:
+            Словарь {user_id: message_id для редактирования или None - отправить новое}
+        """
+        day = self.today()
+        async with async_session() as session:
+            rows = await LiveMessage.get_many(session, user_ids)
+        return {
+            user_id: message_id if message_day == day else None
+            for user_id, (message_id, message_day) in rows.items()
+        }
+
+    async def remember(self, live: Dict[int, Optional[int]], message_ids: Dict[int, int]) -> None:
+        """Сохраняет id новых сообщений (отредактированные остаются прежними)"""
+        day = self.today()
+        changed = {
+            user_id: message_id
+            for user_id, message_id in message_ids.items()
+            if live.get(user_id) != message_id
+        }
+        metrics.inc("live_messages_edited", len(message_ids) - len(changed))
+        if changed and day is not None:
+            async with async_session() as session:
+                await LiveMessage.save_many(session, changed, day)
+
+
+live_messages = LiveMessages()
@@ -0,0 +1,285 @@
+"""
+Постоянная очередь исходящих уведомлений (outbox)
+Монитор расписания складывает сообщения в очередь, отдельный воркер рассылает их.
+Очередь хранится в таблице БД или в Redis stream (если задан RedisSettings.URL),
+поэтому после перезапуска рассылка продолжается с места остановки.
+Доставка "как минимум один раз", ключ идемпотентности - (user_id, group, version).
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+
+from app.business.broadcaster import broadcaster
+from app.business.live_messages import live_messages
+from database.connect import async_session
+from database.services.outbox import Outbox
+from loader import redis_client
+from utils.logging import logger
+from utils.metrics import delivery_tracker
+
+# Сообщений в одной пачке рассылки (при падении повторно уйдет не больше одной пачки)
+BATCH_SIZE: int = 100
+# Пауза между проверками пустой очереди, секунд
+IDLE_DELAY: float = 10
+# Попыток доставки одного сообщения
+MAX_ATTEMPTS: int = 3
+# Сколько хранить обработанные сообщения
+RETENTION = timedelta(days=7)
+# Записей stream за один запрос при отмене устаревших сообщений
+CANCEL_SCAN: int = 1000
+
+# Запись очереди: (id записи, user_id, текст, версия расписания)
+OutboxEntry = Tuple[str, int, str, str]
+
+
+class OutboxMessage:
+    """Сообщение для постановки в очередь"""
+
+    __slots__ = ("user_id", "group", "version", "text")
+
+    def __init__(self, user_id: int, group: str, version: str, text: str):
+        self.user_id = user_id
+        self.group = group
+        self.version = version
+        self.text = text
+
+    @property
+    def key(self) -> str:
+        return f"{self.user_id}:{self.group}:{self.version}"
+
+
+class DatabaseOutbox:
+    """Очередь в таблице outbox"""
+
+    async def append(self, messages: Iterable[OutboxMessage]) -> int:
+        rows = [
+            {"user_id": m.user_id, "group": m.group, "version": m.version, "text": m.text}
+            for m in messages
+        ]
+        if not rows:
+            return 0
+        async with async_session() as session:
+            return await Outbox.append(session, rows)
+
+    async def fetch(self, limit: int) -> List[OutboxEntry]:
+        async with async_session() as session:
+            return await Outbox.get_pending(session, limit)
+
+    async def ack(
+        self, sent: List[OutboxEntry], failed: List[OutboxEntry], dropped: List[OutboxEntry] = ()
+    ) -> None:
+        async with async_session() as session:
+            await Outbox.mark(
+                session,
+                sent_ids=[entry[0] for entry in sent],
+                failed_ids=[entry[0] for entry in failed],
+                max_attempts=MAX_ATTEMPTS,
+                dropped_ids=[entry[0] for entry in dropped],
+            )
+
+    async def cancel_superseded(self, groups: Iterable[str], version: str) -> int:
+        groups = list(groups)
+        if not groups:
+            return 0
+        async with async_session() as session:
+            return await Outbox.cancel_superseded(session, groups, version)
+
+    async def cleanup(self) -> None:
+        async with async_session() as session:
+            await Outbox.delete_processed_before(session, datetime.now() - RETENTION)
+
+
+class RedisOutbox:
+    """Очередь в Redis stream с группой потребителей"""
+
+    STREAM = "outbox:stream"
+    GROUP = "outbox"
+    CONSUMER = "sender"
+    KEY_PREFIX = "outbox:key:"
+    ATTEMPTS_KEY = "outbox:attempts"
+
+    def __init__(self, redis):
+        self.redis = redis
+        self._group_ready = False
+
+    async def _ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            await self.redis.xgroup_create(self.STREAM, self.GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def append(self, messages: Iterable[OutboxMessage]) -> int:
+        await self._ensure_group()
+        messages = list(messages)
+        if not messages:
+            return 0
+
+        # Резервируем ключи идемпотентности, повторно поставленные сообщения пропускаются
+        pipe = self.redis.pipeline(transaction=False)
+        for m in messages:
+            pipe.set(self.KEY_PREFIX + m.key, 1, nx=True, ex=int(RETENTION.total_seconds()))
+        reserved = await pipe.execute()
+
+        pipe = self.redis.pipeline(transaction=False)
+        added = 0
+        for m, is_new in zip(messages, reserved):
+            if is_new:
+                pipe.xadd(
+                    self.STREAM,
+                    {"user_id": m.user_id, "group": m.group, "text": m.text, "version": m.version},
+                )
+                added += 1
+        await pipe.execute()
+        return added
+
+    async def fetch(self, limit: int) -> List[OutboxEntry]:
+        await self._ensure_group()
+        # Сначала доставленные, но не подтвержденные (например, до перезапуска)
+        entries = await self._read("0", limit)
+        if len(entries) < limit:
+            entries += await self._read(">", limit - len(entries))
+        return entries
+
+    async def _read(self, stream_id: str, count: int) -> List[OutboxEntry]:
+        response = await self.redis.xreadgroup(
+            self.GROUP, self.CONSUMER, {self.STREAM: stream_id}, count=count
+        )
+        entries = []
+        for _, items in response or []:
+            for entry_id, fields in items:
+                if not fields:
+                    continue
+                entries.append(
+                    (
+                        entry_id,
+                        int(fields[b"user_id"]),
+                        fields[b"text"].decode("utf-8"),
+                        fields.get(b"version", b"").decode("utf-8"),
+                    )
+                )
+        return entries
+
+    async def ack(
+        self, sent: List[OutboxEntry], failed: List[OutboxEntry], dropped: List[OutboxEntry] = ()
+    ) -> None:
+        done = [entry[0] for entry in sent] + [entry[0] for entry in dropped]
+
+        if failed:
+            pipe = self.redis.pipeline(transaction=False)
+            for entry in failed:
+                pipe.hincrby(self.ATTEMPTS_KEY, entry[0], 1)
+            attempts = await pipe.execute()
+            exhausted = [entry[0] for entry, n in zip(failed, attempts) if n >= MAX_ATTEMPTS]
+            if exhausted:
+                await self.redis.hdel(self.ATTEMPTS_KEY, *exhausted)
+            done += exhausted
+
+        if done:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.xack(self.STREAM, self.GROUP, *done)
+            pipe.xdel(self.STREAM, *done)
+            await pipe.execute()
+
+    async def cancel_superseded(self, groups: Iterable[str], version: str) -> int:
+        """Удаляет из stream неотправленные сообщения групп с другой версией"""
+        groups = {group.encode("utf-8") for group in groups}
+        if not groups:
+            return 0
+        version = version.encode("utf-8")
+
+        # В stream лежат только неподтвержденные записи, поэтому просмотр ограничен очередью
+        cancelled = []
+        start = "-"
+        while items := await self.redis.xrange(self.STREAM, min=start, count=CANCEL_SCAN):
+            for entry_id, fields in items:
+                if fields.get(b"group") in groups and fields.get(b"version") != version:
+                    cancelled.append(entry_id)
+            if len(items) < CANCEL_SCAN:
+                break
+            last_id = items[-1][0]
+            start = "(" + (last_id.decode() if isinstance(last_id, bytes) else last_id)
+
+        if cancelled:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.xack(self.STREAM, self.GROUP, *cancelled)
+            pipe.xdel(self.STREAM, *cancelled)
+            await pipe.execute()
+        return len(cancelled)
+
+    async def cleanup(self) -> None:
+        # Обработанные записи удаляются из stream сразу при подтверждении
+        return
+
+
+class OutboxWorker:
+    """Фоновый рассыльщик сообщений из очереди"""
+
+    def __init__(self, outbox, batch_size: int = BATCH_SIZE):
+        self.outbox = outbox
+        self.batch_size = batch_size
+        self._wakeup = asyncio.Event()
+        self._last_cleanup = datetime.now()
+
+    def wake(self) -> None:
+        """Будит воркер сразу после постановки новых сообщений"""
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        logger.log("MAILING", f"Outbox воркер запущен ({type(self.outbox).__name__})")
+        while True:
+            self._wakeup.clear()
+            try:
+                if not await self.process_batch():
+                    await self._idle()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка в outbox воркере: {e}")
+                await self._idle()
+
+    async def process_batch(self) -> int:
+        """
+        Рассылает одну пачку сообщений из очереди
+
+        Returns:
+            Количество обработанных сообщений
+        """
+        entries = await self.outbox.fetch(self.batch_size)
+        if not entries:
+            return 0
+
+        # Пользователям в режиме live сообщение редактируется
+        live = await live_messages.resolve({entry[1] for entry in entries})
+        report = await broadcaster.broadcast(((entry[1], entry[2]) for entry in entries), live)
+        await live_messages.remember(live, report.message_ids)
+        failed_ids = set(report.failed_ids)
+        blocked_ids = set(report.blocked_ids)
+        sent = [entry for entry in entries if entry[1] not in failed_ids]
+        # Заблокировавшим бота повторно не отправляем
+        dropped = [entry for entry in entries if entry[1] in blocked_ids]
+        failed = [
+            entry for entry in entries if entry[1] in failed_ids and entry[1] not in blocked_ids
+        ]
+        await self.outbox.ack(sent, failed, dropped)
+        delivery_tracker.delivered(entry[3] for entry in sent)
+
+        return len(entries)
+
+    async def _idle(self) -> None:
+        if datetime.now() - self._last_cleanup > timedelta(hours=1):
+            self._last_cleanup = datetime.now()
+            await self.outbox.cleanup()
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=IDLE_DELAY)
+        except asyncio.TimeoutError:
+            pass
+
+
+outbox = RedisOutbox(redis_client) if redis_client else DatabaseOutbox()
+outbox_worker = OutboxWorker(outbox)
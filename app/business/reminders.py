@@ -0,0 +1,261 @@
+"""
+Напоминания о ближайших отключениях ("через 30 хвилин вимкнуть світло")
+Для каждой группы по маскам на сегодня и завтра вычисляются переходы свет есть -> нет
+и нет -> есть, время напоминаний хранится в одной куче (min-heap).
+Новый снимок пересчитывает только группы, маски которых изменились, поэтому
+стоимость зависит от количества переходов, а не от количества пользователей и минут.
+Сработавшие напоминания рассылаются подписчикам группы через broadcaster
+(в группах с каналом - одним сообщением в канал).
+Дни источника начинаются в местную полночь, а слоты идут по местному времени,
+поэтому время переходов считается через SOURCE_TZ (в дни перевода часов
+в сутках 23 или 25 часов).
+"""
+
+import asyncio
+import heapq
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.business.broadcaster import broadcaster
+from app.business.channels import group_channels
+from app.business.github_schedule_monitor import GitHubScheduleMonitor
+from database.connect import async_session
+from database.services.user import User
+from utils.github_schedule import EMOJI_BULB, EMOJI_LIGHT_OFF, EMOJI_LIGHT_ON
+from utils.logging import logger
+from utils.metrics import metrics
+from utils.schedule_bits import SLOTS, DaySchedule
+from utils.schedule_store import SOURCE_TZ, ScheduleSnapshot, schedule_store
+
+# За сколько секунд до перехода напоминать
+LEAD: int = 30 * 60
+# Напоминания, опоздавшие больше чем на столько секунд, не отправляются
+GRACE: int = 5 * 60
+# Пауза ожидания, если напоминаний нет
+IDLE_DELAY: float = 300
+
+SLOT_MINUTES = 24 * 60 // SLOTS
+
+OFF = "off"
+ON = "on"
+
+# Элемент кучи: (время напоминания, время перехода, группа, тип, поколение группы)
+Reminder = Tuple[int, int, str, str, int]
+
+
+def slot_time(day: int, slot: int) -> int:
+    """
+    Начало слота по местному времени
+
+    Args:
+        day: Местная полночь дня (unix timestamp)
+        slot: Номер получаса от полуночи (48 и больше - следующие дни)
+    """
+    midnight = datetime.fromtimestamp(day, SOURCE_TZ).replace(tzinfo=None)
+    return int(SOURCE_TZ.localize(midnight + timedelta(minutes=slot * SLOT_MINUTES)).timestamp())
+
+
+def next_day(day: int) -> int:
+    """Местная полночь следующего дня (через 23, 24 или 25 часов)"""
+    return slot_time(day, SLOTS)
+
+
+def find_transitions(
+    day: int, today: DaySchedule, tomorrow: Optional[DaySchedule]
+) -> List[Tuple[int, str]]:
+    """
+    Переходы между "свет есть" и "света нет" за сегодня и завтра
+
+    Переход учитывается только между известными состояниями: из "свет есть"
+    или "возможно отключение" в "света нет" и из "света нет" в "свет есть".
+
+    Args:
+        day: Начало сегодняшнего дня (unix timestamp)
+        today: Маски на сегодня
+        tomorrow: Маски на завтра (если уже опубликованы)
+
+    Returns:
+        Список (время перехода, OFF или ON) по возрастанию времени
+    """
+    off, known_on = today.off_mask, today.on_mask | today.maybe_mask
+    on = today.on_mask
+    if tomorrow is not None:
+        off |= tomorrow.off_mask << SLOTS
+        known_on |= (tomorrow.on_mask | tomorrow.maybe_mask) << SLOTS
+        on |= tomorrow.on_mask << SLOTS
+
+    goes_off = off & (known_on << 1)
+    goes_on = on & (off << 1)
+
+    transitions = []
+    for mask, kind in ((goes_off, OFF), (goes_on, ON)):
+        while mask:
+            low = mask & -mask
+            transitions.append((slot_time(day, low.bit_length() - 1), kind))
+            mask ^= low
+    return sorted(transitions)
+
+
+class ReminderScheduler:
+    """Куча напоминаний по группам и таймер, который их рассылает"""
+
+    def __init__(self, lead: int = LEAD):
+        self.lead = lead
+        self._heap: List[Reminder] = []
+        # Маски, по которым посчитаны напоминания группы, и поколение ее записей в куче
+        self._keys: Dict[str, tuple] = {}
+        self._generation: Dict[str, int] = {}
+        # Сколько записей группы еще в куче (для удаления устаревших)
+        self._pending: Dict[str, int] = {}
+        self._stale = 0
+        self._names: Dict[str, str] = {}
+        self._wakeup = asyncio.Event()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def on_snapshot(self, snapshot: ScheduleSnapshot) -> None:
+        if snapshot.today:
+            self._names = dict(snapshot.group_names)
+            self.rebuild(snapshot.days, int(snapshot.today))
+
+    def rebuild(self, days, today: int, now: Optional[float] = None) -> int:
+        """
+        Пересчитывает напоминания групп, маски которых изменились
+
+        Args:
+            days: Маски {день: {группа: DaySchedule}}
+            today: Сегодняшний день (unix timestamp)
+            now: Текущее время (по умолчанию time.time())
+
+        Returns:
+            Количество пересчитанных групп
+        """
+        now = time.time() if now is None else now
+        today_groups = days.get(today, {})
+        tomorrow_groups = days.get(next_day(today), {})
+        head = self._heap[0][0] if self._heap else None
+
+        changed = 0
+        for group in self._keys.keys() - today_groups.keys():
+            self._drop(group)
+            changed += 1
+
+        for group, schedule in today_groups.items():
+            tomorrow = tomorrow_groups.get(group)
+            key = (today, schedule.to_pair(), tomorrow.to_pair() if tomorrow else None)
+            if self._keys.get(group) == key:
+                continue
+
+            self._drop(group)
+            self._keys[group] = key
+            generation = self._generation[group]
+            for at, kind in find_transitions(today, schedule, tomorrow):
+                if at - self.lead >= now - GRACE:
+                    heapq.heappush(self._heap, (at - self.lead, at, group, kind, generation))
+                    self._pending[group] += 1
+            changed += 1
+
+        if self._stale > len(self._heap) // 2:
+            self._compact()
+        if self._heap and (head is None or self._heap[0][0] < head):
+            self._wakeup.set()
+
+        if changed:
+            logger.log(
+                "SCHEDULE", f"Напоминания пересчитаны для {changed} групп, в очереди {len(self)}"
+            )
+        return changed
+
+    def _drop(self, group: str) -> None:
+        """Помечает записи группы в куче устаревшими"""
+        self._keys.pop(group, None)
+        self._generation[group] = self._generation.get(group, 0) + 1
+        self._stale += self._pending.get(group, 0)
+        self._pending[group] = 0
+
+    def _compact(self) -> None:
+        self._heap = [item for item in self._heap if self._is_live(item)]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def _is_live(self, item: Reminder) -> bool:
+        return item[4] == self._generation.get(item[2])
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._stale
+
+    def pop_due(self, now: float) -> List[Reminder]:
+        """Снимает с кучи напоминания, время которых пришло (опоздавшие пропускаются)"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            item = heapq.heappop(self._heap)
+            if not self._is_live(item):
+                self._stale -= 1
+                continue
+            self._pending[item[2]] -= 1
+            if item[0] >= now - GRACE:
+                due.append(item)
+        return due
+
+    async def run(self) -> None:
+        logger.log("MAILING", "Планировщик напоминаний запущен")
+        # Снимок мог загрузиться раньше, чем планировщик подписался на обновления
+        if snapshot := schedule_store.get():
+            self.on_snapshot(snapshot)
+
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            if due := self.pop_due(now):
+                task = asyncio.create_task(self._send(due))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            delay = self._heap[0][0] - now if self._heap else IDLE_DELAY
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send(self, due: Iterable[Reminder]) -> None:
+        """Рассылает напоминания подписчикам групп (один запрос на все группы)"""
+        try:
+            texts: Dict[float, List[str]] = {}
+            for _, at, group, kind, _ in due:
+                if group_number := GitHubScheduleMonitor._extract_group_number(group):
+                    texts.setdefault(group_number, []).append(
+                        self._format_reminder(group, kind, at)
+                    )
+
+            async with async_session() as session:
+                subscribers = await User.get_subscribers_by_groups(
+                    session, texts.keys(), channel_groups=group_channels.groups
+                )
+
+            messages = []
+            for group_number, group_texts in texts.items():
+                text = "\n\n".join(group_texts)
+                if (channel_id := group_channels.get(group_number)) is not None:
+                    messages.append((channel_id, text))
+                messages.extend((user_id, text) for user_id, _ in subscribers.get(group_number, ()))
+
+            report = await broadcaster.broadcast(messages)
+            metrics.inc("reminders_fired", len(texts))
+            metrics.inc("reminders_sent", report.sent)
+        except Exception as e:
+            logger.error(f"Ошибка при рассылке напоминаний: {e}")
+
+    def _format_reminder(self, group: str, kind: str, at: int) -> str:
+        moment = datetime.fromtimestamp(at, SOURCE_TZ).strftime("%H:%M")
+        minutes = self.lead // 60
+        name = self._names.get(group, group)
+        if kind == OFF:
+            text = f"{EMOJI_LIGHT_OFF} <b>Через {minutes} хв. ({moment}) вимкнуть світло</b>\n"
+        else:
+            text = f"{EMOJI_LIGHT_ON} <b>Через {minutes} хв. ({moment}) світло повернеться</b>\n"
+        return text + f"{EMOJI_BULB} Група: {name}"
+
+
+reminder_scheduler = ReminderScheduler()
+# Каждый новый снимок пересчитывает напоминания изменившихся групп
+schedule_store.subscribe(reminder_scheduler.on_snapshot)
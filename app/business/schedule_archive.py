@@ -0,0 +1,208 @@
+"""
+Архив версий расписания
+Каждая новая версия хранит только изменившиеся маски (день, группа) относительно
+предыдущей записи, каждая KEYFRAME_EVERY-я запись - полный снимок (ключевой кадр).
+Состояние на момент T восстанавливается от ближайшего ключевого кадра,
+записи старше RETENTION удаляются целыми цепочками.
+
+Формат данных записи (сжат zlib), последовательность:
+    день (uint32), флаг (0 - маски, 1 - группа удалена), длина имени группы (uint8),
+    имя группы, маски off и uncertain по 6 байт (только для флага 0)
+"""
+
+import struct
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.connect import async_session
+from database.services.schedule_archive import ArchiveRow, ScheduleArchive
+from utils.logging import logger
+from utils.schedule_analytics import MAX_DAYS, schedule_history
+from utils.schedule_bits import DaySchedule
+from utils.schedule_store import ScheduleSnapshot
+
+# Полный снимок раз в столько записей (ограничивает длину цепочки при восстановлении)
+KEYFRAME_EVERY: int = 96
+# Сколько хранить историю
+RETENTION = timedelta(days=MAX_DAYS)
+
+_HEADER = struct.Struct("<IBB")
+_MASK_BYTES = 6
+_SET, _DELETE = 0, 1
+
+Days = Dict[int, Dict[str, DaySchedule]]
+# Изменение: (день, группа, новое расписание или None, если группа удалена)
+Change = Tuple[int, str, Optional[DaySchedule]]
+
+
+def encode_changes(changes: List[Change]) -> bytes:
+    parts = []
+    for day, group, schedule in changes:
+        name = group.encode("utf-8")
+        parts.append(_HEADER.pack(day, _DELETE if schedule is None else _SET, len(name)))
+        parts.append(name)
+        if schedule is not None:
+            parts.append(schedule.off.to_bytes(_MASK_BYTES, "little"))
+            parts.append(schedule.uncertain.to_bytes(_MASK_BYTES, "little"))
+    return zlib.compress(b"".join(parts), 9)
+
+
+def decode_changes(payload: bytes) -> Iterator[Change]:
+    raw = zlib.decompress(payload)
+    offset = 0
+    while offset < len(raw):
+        day, flag, length = _HEADER.unpack_from(raw, offset)
+        offset += _HEADER.size
+        group = raw[offset : offset + length].decode("utf-8")
+        offset += length
+        if flag == _DELETE:
+            yield day, group, None
+            continue
+        off = int.from_bytes(raw[offset : offset + _MASK_BYTES], "little")
+        uncertain = int.from_bytes(
+            raw[offset + _MASK_BYTES : offset + 2 * _MASK_BYTES], "little"
+        )
+        offset += 2 * _MASK_BYTES
+        yield day, group, DaySchedule(off, uncertain)
+
+
+def diff_days(old: Mapping[int, Mapping[str, DaySchedule]], new: Days) -> List[Change]:
+    """Изменения, которые переводят {old} в {new}"""
+    changes = []
+    for day in old.keys() | new.keys():
+        previous, current = old.get(day, {}), new.get(day, {})
+        for group in sorted(previous.keys() | current.keys()):
+            schedule = current.get(group)
+            if schedule != previous.get(group):
+                changes.append((day, group, schedule))
+    return sorted(changes, key=lambda change: change[:2])
+
+
+def full_changes(days: Days) -> List[Change]:
+    return [
+        (day, group, schedule)
+        for day in sorted(days)
+        for group, schedule in sorted(days[day].items())
+    ]
+
+
+def apply_changes(state: Days, changes: Iterator[Change]) -> None:
+    for day, group, schedule in changes:
+        if schedule is None:
+            state.get(day, {}).pop(group, None)
+            if day in state and not state[day]:
+                del state[day]
+        else:
+            state.setdefault(day, {})[group] = schedule
+
+
+def _utc(moment: datetime) -> datetime:
+    """Время в БД хранится в UTC без часового пояса"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+class SnapshotArchive:
+    """Запись версий в архив и восстановление состояния на момент времени"""
+
+    def __init__(self):
+        # Последнее записанное в архив состояние (None - нужно восстановить из БД)
+        self._state: Optional[Days] = None
+        self._last_id: Optional[int] = None
+        self._since_keyframe = 0
+        self._version: Optional[str] = None
+
+    async def record(self, session: AsyncSession, snapshot: ScheduleSnapshot) -> bool:
+        """
+        Записывает версию, если маски изменились
+
+        Returns:
+            True, если в архив добавлена запись
+        """
+        if snapshot.version == self._version:
+            return False
+
+        try:
+            # Архив мог дописать другой инстанс, пока этот не был лидером
+            if self._state is None or await ScheduleArchive.get_last_id(session) != self._last_id:
+                await self._reload(session)
+
+            current = {day: dict(groups) for day, groups in snapshot.days.items()}
+            changes = diff_days(self._state, current)
+            if not changes and self._last_id is not None:
+                self._version = snapshot.version
+                return False
+
+            keyframe = self._last_id is None or self._since_keyframe + 1 >= KEYFRAME_EVERY
+            payload = encode_changes(full_changes(current) if keyframe else changes)
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            self._last_id = await ScheduleArchive.append(
+                session, snapshot.version, now, keyframe, payload
+            )
+        except Exception:
+            self._state = None
+            raise
+
+        self._state = current
+        self._version = snapshot.version
+        self._since_keyframe = 0 if keyframe else self._since_keyframe + 1
+        logger.log(
+            "SCHEDULE",
+            f"Версия {snapshot.version[:12]} в архиве: "
+            f"{'ключевой кадр' if keyframe else f'{len(changes)} изменений'}, {len(payload)} Б",
+        )
+
+        if keyframe:
+            if deleted := await ScheduleArchive.delete_before(session, now - RETENTION):
+                logger.log("SCHEDULE", f"Из архива удалено {deleted} старых версий")
+        return True
+
+    async def _reload(self, session: AsyncSession) -> None:
+        chain = await ScheduleArchive.get_chain(session)
+        self._state = self._replay(chain)
+        self._last_id = chain[-1][0] if chain else None
+        self._since_keyframe = max(len(chain) - 1, 0)
+
+    @staticmethod
+    def _replay(chain: List[ArchiveRow]) -> Days:
+        state: Days = {}
+        for _, _, _, payload in chain:
+            apply_changes(state, decode_changes(payload))
+        return state
+
+    async def state_at(self, session: AsyncSession, moment: datetime) -> Days:
+        """
+        Расписание, которое было актуальным на момент {moment}
+
+        Returns:
+            Словарь {день (unix timestamp): {группа: DaySchedule}}
+        """
+        return self._replay(await ScheduleArchive.get_chain(session, until=_utc(moment)))
+
+    async def load_history(self, session: AsyncSession, since: datetime) -> Days:
+        """Последняя известная версия каждого дня из записей, полученных после {since}"""
+        interned: Dict[Tuple[int, int], DaySchedule] = {}
+        history: Days = {}
+        for _, _, _, payload in await ScheduleArchive.get_chain(session, since=_utc(since)):
+            for day, group, schedule in decode_changes(payload):
+                if schedule is not None:
+                    schedule = interned.setdefault(schedule.to_pair(), schedule)
+                    history.setdefault(day, {})[group] = schedule
+        return history
+
+    async def restore_history(self) -> None:
+        """Заполняет историю для аналитики из архива (при запуске)"""
+        try:
+            async with async_session() as session:
+                days = await self.load_history(session, datetime.now(timezone.utc) - RETENTION)
+            schedule_history.add_days(days)
+            logger.log("SCHEDULE", f"История расписания из архива: {len(days)} дней")
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке архива расписания: {e}")
+
+
+schedule_archive = SnapshotArchive()
@@ -1,14 +1,12 @@
-import asyncio
 import json
 from pathlib import Path
 from typing import Dict, List
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.business.broadcaster import broadcaster
 from data.config import DIR
-from database.models.user import UserModel
-from loader import bot
+from database.services.user import User
 from utils.light_schedule import (
     format_schedule_to_text,
     get_changed_groups,
@@ -77,20 +75,25 @@ class ScheduleMonitor:
             session: Сессия БД
             changed_groups: Список изменившихся групп
         """
+        # Извлекаем номера групп из названий (например, "Група 3.1" -> 3.1)
+        group_numbers = {}
         for change in changed_groups:
             group_name = change["group_name"]
-            change_type = change["type"]
+            if group_number := self._extract_group_number(group_name):
+                group_numbers[group_name] = group_number
+            else:
+                logger.warning(f"Не удалось извлечь номер группы из '{group_name}'")
 
-            try:
-                # Извлекаем номер группы из названия (например, "Група 3.1" -> 3.1)
-                group_number = self._extract_group_number(group_name)
+        # Получаем подписчиков всех измененных групп одним запросом
+        subscribers = await User.get_subscribers_by_groups(session, group_numbers.values())
 
-                if not group_number:
-                    logger.warning(f"Не удалось извлечь номер группы из '{group_name}'")
-                    continue
+        messages = []
+
+        for change in changed_groups:
+            group_name = change["group_name"]
 
-                # Получаем пользователей этой группы с включенными уведомлениями
-                users = await self._get_users_with_alerts(session, group_number)
+            try:
+                users = subscribers.get(group_numbers.get(group_name))
 
                 if not users:
                     logger.log(
@@ -98,30 +101,20 @@ class ScheduleMonitor:
                     )
                     continue
 
-                # Формируем текст уведомления
+                # Формируем текст уведомления (один на группу)
                 notification_text = self._format_notification(change)
-
-                # Отправляем уведомления всем пользователям
-                sent_count = 0
-                for user in users:
-                    try:
-                        await bot.send_message(
-                            chat_id=user.id, text=notification_text, parse_mode="HTML"
-                        )
-                        sent_count += 1
-                        # Небольшая задержка между отправками
-                        await asyncio.sleep(0.05)
-                    except Exception as e:
-                        logger.error(f"Ошибка отправки уведомления пользователю {user.id}: {e}")
-
-                logger.log(
-                    "SCHEDULE",
-                    f"Отправлено {sent_count} уведомлений для группы {group_name}",
-                )
+                messages.extend((user_id, notification_text) for user_id, _ in users)
 
             except Exception as e:
                 logger.error(f"Ошибка при обработке группы {group_name}: {e}")
 
+        # Отправляем уведомления всех групп одной рассылкой
+        report = await broadcaster.broadcast(messages)
+        logger.log(
+            "SCHEDULE",
+            f"Отправлено {report.sent} из {report.total} уведомлений за {report.duration:.1f} с",
+        )
+
     @staticmethod
     def _extract_group_number(group_name: str) -> float | None:
         """
@@ -144,26 +137,6 @@ class ScheduleMonitor:
                 return None
         return None
 
-    @staticmethod
-    async def _get_users_with_alerts(session: AsyncSession, group_number: float) -> List[UserModel]:
-        """
-        Получает пользователей группы с включенными уведомлениями
-
-        Args:
-            session: Сессия БД
-            group_number: Номер группы
-
-        Returns:
-            Список пользователей
-        """
-        stmt = (
-            select(UserModel)
-            .where(UserModel.group == group_number)
-            .where(UserModel.is_alerts == True)
-        )
-        result = await session.execute(stmt)
-        return list(result.scalars().all())
-
     @staticmethod
     def _format_notification(change: Dict) -> str:
         """
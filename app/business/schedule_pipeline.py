@@ -0,0 +1,120 @@
+"""
+Конвейер обновления расписания: загрузка -> хеш -> сравнение -> очередь уведомлений -> сохранение
+-> архив версий
+Все шаги выполняются последовательно одной задачей APScheduler, поэтому сравнение
+никогда не читает расписание, которое в этот момент перезаписывается.
+Интервал до следующего запуска подбирается по тому, как давно менялось расписание.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.business.github_schedule_monitor import github_schedule_monitor
+from app.business.leader import leader
+from app.business.schedule_archive import schedule_archive
+from database.connect import async_session
+from loader import scheduler
+from utils.github_fetcher import github_fetcher
+from utils.logging import logger
+from utils.metrics import metrics
+from utils.schedule_store import SOURCE_TZ, ScheduleSnapshot, schedule_store
+
+# Интервалы проверки, секунд
+FAST_INTERVAL: int = 60  # расписание недавно менялось
+NORMAL_INTERVAL: int = 300
+NIGHT_INTERVAL: int = 1200  # ночью, если ничего не меняется
+
+# Сколько после изменения проверять с коротким интервалом
+RECENT_CHANGE = timedelta(hours=1)
+# Ночные часы по времени источника
+NIGHT_HOURS = range(0, 6)
+
+JOB_ID = "schedule_pipeline"
+
+
+class SchedulePipeline:
+    """Периодическая загрузка и проверка расписания с адаптивным интервалом"""
+
+    def __init__(self):
+        # Когда этот инстанс последний раз получил новую версию расписания
+        self.last_change: Optional[datetime] = None
+        self.interval = NORMAL_INTERVAL
+
+    def start(self) -> None:
+        """Ставит задачу в планировщик (первый запуск - сразу)"""
+        scheduler.add_job(
+            self.run_once,
+            "interval",
+            seconds=self.interval,
+            id=JOB_ID,
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            next_run_time=datetime.now(timezone.utc),
+        )
+
+    async def run_once(self) -> None:
+        try:
+            await self._step()
+        except Exception as e:
+            logger.error(f"Ошибка в конвейере расписания: {e}")
+        finally:
+            self._reschedule()
+
+    async def _step(self) -> None:
+        previous = schedule_store.get()
+
+        # 1. Загрузка (условный запрос) и хеширование - новый снимок попадает в память
+        await github_fetcher.fetch()
+        snapshot = schedule_store.get()
+        if snapshot is None:
+            return
+
+        if previous is None or previous.version != snapshot.version:
+            self.last_change = datetime.now(timezone.utc)
+            metrics.inc("schedule_versions")
+
+        # 2-4. Сравнение, постановка уведомлений в очередь и сохранение масок - только лидер
+        # (первый запуск ждет результата выбора лидера)
+        if not await leader.wait_decided():
+            return
+
+        async with async_session() as session:
+            # Уведомления ставятся в очередь через окно объединения (метрики считает оно же)
+            await github_schedule_monitor.check_and_notify(session, snapshot)
+
+            # 5. Изменения масок - в архив версий
+            if await schedule_archive.record(session, snapshot):
+                metrics.inc("schedule_archived")
+
+    def next_interval(self, snapshot: Optional[ScheduleSnapshot], now: datetime) -> int:
+        """
+        Интервал до следующей проверки
+
+        Args:
+            snapshot: Текущий снимок расписания
+            now: Текущее время (с часовым поясом)
+        """
+        changes = [self.last_change]
+        if snapshot is not None:
+            changes.append(snapshot.updated_at)
+        last_change = max((moment for moment in changes if moment), default=None)
+
+        if last_change and now - last_change < RECENT_CHANGE:
+            return FAST_INTERVAL
+        if now.astimezone(SOURCE_TZ).hour in NIGHT_HOURS:
+            return NIGHT_INTERVAL
+        return NORMAL_INTERVAL
+
+    def _reschedule(self) -> None:
+        interval = self.next_interval(schedule_store.get(), datetime.now(timezone.utc))
+        if interval == self.interval:
+            return
+
+        self.interval = interval
+        if scheduler.get_job(JOB_ID):
+            scheduler.reschedule_job(JOB_ID, trigger="interval", seconds=interval)
+        logger.log("SCHEDULE", f"Интервал проверки расписания: {interval} с")
+
+
+schedule_pipeline = SchedulePipeline()
@@ -8,6 +8,9 @@ def get_default_commands(lang: str = "en"):
         BotCommand(command="/start", description=_("Почати чат", locale=lang)),
         BotCommand(command="/group", description=_("Зміна группи", locale=lang)),
         BotCommand(command="/schedule", description=_("Розклад відключень", locale=lang)),
+        BotCommand(command="/week", description=_("Статистика за тиждень", locale=lang)),
+        BotCommand(command="/live", description=_("Живий розклад", locale=lang)),
+        BotCommand(command="/channel", description=_("Канал групи", locale=lang)),
         BotCommand(command="/lang", description=_("Змінити мову", locale=lang)),
     ]
 
@@ -20,6 +23,8 @@ def get_admins_commands(lang: str = "en"):
         [
             BotCommand(command="/admin", description=_("admin panel", locale=lang)),
             BotCommand(command="/logs", description=_("send logs", locale=lang)),
+            BotCommand(command="/metrics", description=_("bot metrics", locale=lang)),
+            BotCommand(command="/outage_stats", description=_("outage stats", locale=lang)),
         ]
     )
     return commands
@@ -1,6 +1,8 @@
 from .admin import admin_router
 from .ban import admin_router
 from .logs import admin_router
+from .metrics import admin_router
+from .outage_stats import admin_router
 from .restart import admin_router
 from .stats import admin_router
 
@@ -22,15 +22,23 @@ async def ban_unban_users_command(
     text_success, text_action, text_error = get_ban_text(is_banned)
 
     if args := check_args_type(type=int, data_list=command.args):
-        for id in args:
-            try:
-                if is_banned:
-                    await User.update(session, id=id, status=UserStatus.Banned)
-                else:
-                    await User.update(session, id=id, status=UserStatus.User)
-                await message.answer(f"✅ User <code>{id}</code> has been {text_action}.")
-            except Exception:
-                await message.answer(f"{text_error} for user <code>{id}</code>.")
+        ids = list(dict.fromkeys(args))
+        try:
+            if is_banned:
+                changed = await User.set_status_many(session, ids, UserStatus.Banned)
+            else:
+                # Разбан не понижает модераторов и администраторов
+                changed = await User.set_status_many(
+                    session, ids, UserStatus.User, from_status=UserStatus.Banned
+                )
+        except Exception:
+            await message.answer(f"{text_error}.")
+            return
+
+        text = f"{text_action}: <b>{len(changed)}</b> of {len(ids)} users."
+        if skipped := len(ids) - len(changed):
+            text += f"\nSkipped (not found or unchanged): {skipped}"
+        await message.answer(text)
     else:
         await message.answer(text_success)
 
@@ -0,0 +1,19 @@
+from aiogram import types
+from aiogram.filters import Command
+from aiogram.filters.state import StateFilter
+
+from app.business.leader import leader
+from app.business.schedule_pipeline import schedule_pipeline
+from app.routers import admin_router
+from utils.metrics import metrics
+
+
+@admin_router.message(StateFilter(None), Command("metrics"))
+async def _metrics_command(message: types.Message) -> None:
+    """Показывает метрики конвейера расписания и рассылки"""
+    text = (
+        f"Leader: {leader.is_leader}\n"
+        f"Schedule check interval: {schedule_pipeline.interval}s\n"
+        f"{metrics.format()}"
+    )
+    await message.answer(f"<pre>{text}</pre>")
@@ -0,0 +1,34 @@
+from aiogram import types
+from aiogram.filters import Command, CommandObject
+from aiogram.filters.state import StateFilter
+
+from app.routers import admin_router
+from utils.schedule_analytics import schedule_history
+
+
+@admin_router.message(StateFilter(None), Command("outage_stats"))
+async def _outage_stats_command(message: types.Message, command: CommandObject) -> None:
+    """Рейтинг групп по часам без света за период (по умолчанию 7 дней): /outage_stats 30"""
+    days = int(command.args) if command.args and command.args.isdigit() else 7
+    report = schedule_history.report(days)
+
+    if not report or not report.groups:
+        await message.answer("No schedule history yet")
+        return
+
+    lines = [
+        f"{report.start:%d.%m.%Y} - {report.end:%d.%m.%Y} ({report.days} days)",
+        f"{'#':>2} {'group':<7} {'off h':>6} {'maybe h':>7} {'longest':>8}",
+    ]
+    for stats in report.groups:
+        longest = (
+            f"{stats.longest_hours:g}h {stats.longest_start:%d.%m %H:%M}"
+            if stats.longest_start
+            else "-"
+        )
+        lines.append(
+            f"{stats.rank:>2} {stats.group.replace('GPV', ''):<7} "
+            f"{stats.hours_off:>6g} {stats.hours_uncertain:>7g} {longest:>8}"
+        )
+
+    await message.answer("<pre>" + "\n".join(lines) + "</pre>")
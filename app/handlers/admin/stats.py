@@ -4,10 +4,33 @@ from aiogram.filters.state import StateFilter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.routers import admin_router
-from database.services.user import User
+from database.services.stats import Stats, UserStats
 
 
 @admin_router.message(StateFilter(None), Command("stats"))
 async def _stats_command(message: types.Message, session: AsyncSession) -> None:
-    all_users = await User.get_all(session)
-    await message.answer(f"Users: {len(all_users)}")
+    """Показывает статистику пользователей (кешируется на STATS_TTL секунд)"""
+    stats = await Stats.get_user_stats(session)
+    await message.answer(format_stats(stats))
+
+
+def format_stats(stats: UserStats) -> str:
+    lines = [
+        f"👥 Users: <b>{stats.total}</b>",
+        f"🔔 Alerts on: {stats.alerts}",
+        f"🔒 Banned: {stats.banned}",
+        f"💤 Inactive: {stats.inactive}",
+        f"🆕 New today: {stats.new_today}, this week: {stats.new_week}",
+        "",
+        "<b>Groups:</b>",
+    ]
+    groups = sorted(stats.groups.items(), key=lambda item: (item[0] is None, item[0] or 0))
+    lines.extend(f"  {group or 'not set'}: {count}" for group, count in groups)
+
+    lines.extend(["", "<b>Languages:</b>"])
+    lines.extend(
+        f"  {language or 'not set'}: {count}" for language, count in stats.languages.most_common()
+    )
+
+    lines.append(f"\n<i>Updated at {stats.created_at:%H:%M:%S} UTC</i>")
+    return "\n".join(lines)
@@ -1,5 +1,7 @@
 from .alerts import user_router
+from .channel import user_router
 from .change_group import user_router
+from .live import user_router
 from .shedule import user_router
 
 __all__ = ["user_router"]
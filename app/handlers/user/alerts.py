@@ -3,6 +3,7 @@ from aiogram.filters.state import StateFilter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.filters.user import IsToggleAlerts
+from app.handlers.user.channel import offer_channel
 from app.keyboards.default.base import base_kb
 from app.routers import user_router
 from database.models.user import UserModel
@@ -25,3 +26,5 @@ async def toggle_alerts_handler(
         text = "🔕 <b>Сповіщення вимкнено</b>\n\nВи більше не будете отримувати сповіщення про зміни в розкладі."
 
     await message.answer(text, reply_markup=base_kb, parse_mode="HTML")
+    if new_status:
+        await offer_channel(message, user.group, user.is_dm_alerts)
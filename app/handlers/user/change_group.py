@@ -4,6 +4,7 @@ from aiogram.fsm.context import FSMContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.filters.user import IsGroupChange
+from app.handlers.user.channel import offer_channel
 from app.keyboards.default.base import base_kb
 from app.routers import user_router
 from app.states import GrouoChangeState
@@ -45,6 +46,7 @@ async def _example_command(
         f"Групу було змінено на:\n{message.text}",
         reply_markup=base_kb,
     )
+    await offer_channel(message, group, user.is_dm_alerts)
 
 
 def to_float_or_none(value: str):
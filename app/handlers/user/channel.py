@@ -0,0 +1,56 @@
+from aiogram import types
+from aiogram.filters import Command
+from aiogram.filters.state import StateFilter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.business.channels import group_channels
+from app.filters.keyboard import ChannelCallback
+from app.keyboards.inline.channel import channel_ikb
+from app.routers import user_router
+from database.models.user import UserModel
+from database.services.user import User
+
+
+def channel_text(group: float, is_dm_alerts: bool) -> str:
+    text = f"📢 <b>У групи {group} є канал</b>\n\nЗміни в розкладі та нагадування публікуються в каналі групи."
+    if is_dm_alerts:
+        return text + "\n\n✉️ Ви також отримуєте їх в особисті повідомлення."
+    return text + "\n\n✉️ В особисті повідомлення вони не надходять - приєднайтеся до каналу або увімкніть особисті сповіщення."
+
+
+async def offer_channel(message: types.Message, group: float, is_dm_alerts: bool) -> None:
+    """Предлагает вступить в канал группы, если он настроен"""
+    if link := group_channels.link(group):
+        await message.answer(
+            channel_text(group, is_dm_alerts),
+            reply_markup=channel_ikb(link, is_dm_alerts),
+            parse_mode="HTML",
+        )
+
+
+@user_router.message(StateFilter(None), Command("channel"))
+async def channel_command(message: types.Message, user: UserModel) -> None:
+    """Показывает канал группы пользователя"""
+    if not group_channels.link(user.group):
+        await message.answer("ℹ️ У вашої групи немає каналу, сповіщення надходять в особисті повідомлення.")
+        return
+    await offer_channel(message, user.group, user.is_dm_alerts)
+
+
+@user_router.callback_query(ChannelCallback.filter())
+async def channel_dm_toggle(
+    callback: types.CallbackQuery,
+    callback_data: ChannelCallback,
+    user: UserModel,
+    session: AsyncSession,
+) -> None:
+    """Включает или выключает личные уведомления при наличии канала"""
+    await User.update(session=session, id=user.id, is_dm_alerts=callback_data.dm)
+
+    if link := group_channels.link(user.group):
+        await callback.message.edit_text(
+            channel_text(user.group, callback_data.dm),
+            reply_markup=channel_ikb(link, callback_data.dm),
+            parse_mode="HTML",
+        )
+    await callback.answer()
@@ -0,0 +1,34 @@
+from aiogram import types
+from aiogram.filters import Command
+from aiogram.filters.state import StateFilter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.business.live_messages import live_messages
+from app.keyboards.default.base import base_kb
+from app.routers import user_router
+from database.models.user import UserModel
+from database.services.live_message import LiveMessage
+from utils.github_schedule import format_schedule_text
+
+
+@user_router.message(StateFilter(None), Command("live"))
+async def live_command(message: types.Message, user: UserModel, session: AsyncSession) -> None:
+    """Переключает режим live: одно сообщение с расписанием, которое обновляется при изменениях"""
+
+    if await LiveMessage.is_enabled(session, user.id):
+        await LiveMessage.disable(session, user.id)
+        text = "🔕 <b>Живий розклад вимкнено</b>\n\nПро зміни в розкладі ви знову отримуватимете окремі повідомлення."
+        await message.answer(text, reply_markup=base_kb, parse_mode="HTML")
+        return
+
+    if not user.group:
+        await message.answer("❌ Спочатку вкажіть вашу групу командою /group")
+        return
+
+    text = "✅ <b>Живий розклад увімкнено</b>\n\nПовідомлення нижче оновлюватиметься при кожній зміні розкладу замість нових сповіщень. Нове повідомлення надходитиме раз на день."
+    if not user.is_alerts:
+        text += "\n\n🔔 Сповіщення зараз вимкнені - увімкніть їх, щоб розклад оновлювався."
+    await message.answer(text, reply_markup=base_kb, parse_mode="HTML")
+
+    schedule = await message.answer(format_schedule_text(str(user.group)), parse_mode="HTML")
+    await LiveMessage.enable(session, user.id, schedule.message_id, live_messages.today())
@@ -5,7 +5,13 @@ from aiogram.filters.state import StateFilter
 from app.filters.user import IsShedule
 from app.routers import user_router
 from database.models.user import UserModel
-from utils.github_schedule import format_schedule_text, get_all_available_groups, parse_group_number
+from utils.github_schedule import (
+    format_schedule_text,
+    format_week_text,
+    get_all_available_groups,
+    parse_group_number,
+)
+from utils.logging import logger
 
 
 @user_router.message(StateFilter(None), Command("schedule"))
@@ -59,6 +65,26 @@ async def schedule_button_handler(message: types.Message, user: UserModel) -> No
         await message.answer(text, parse_mode="HTML")
 
 
+@user_router.message(StateFilter(None), Command("week"))
+async def week_command(message: types.Message, user: UserModel) -> None:
+    """Статистика отключений группы пользователя за последнюю неделю"""
+
+    if not user.group:
+        await message.answer(
+            "💡 Спочатку встановіть вашу групу через кнопку "
+            '"🔄 Змінити групу" або відправте номер групи.\n\n'
+            "Наприклад: <code>3.1</code>",
+            parse_mode="HTML",
+        )
+        return
+
+    try:
+        await message.answer(format_week_text(str(user.group)), parse_mode="HTML")
+    except Exception as e:
+        logger.error(f"Ошибка статистики за неделю для {user.id}: {e}")
+        await message.answer("❌ Помилка при отриманні статистики. Спробуйте пізніше.")
+
+
 @user_router.message(StateFilter(None))
 async def group_number_handler(message: types.Message, user: UserModel) -> None:
     """Обработка прямого ввода номера группы"""
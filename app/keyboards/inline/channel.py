@@ -0,0 +1,15 @@
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from app.filters.keyboard import ChannelCallback
+
+
+def channel_ikb(link: str, is_dm_alerts: bool):
+    builder = InlineKeyboardBuilder()
+    builder.button(text="📢 Приєднатися до каналу", url=link)
+    if is_dm_alerts:
+        builder.button(text="🔕 Лише канал", callback_data=ChannelCallback(dm=False))
+    else:
+        builder.button(text="✉️ Отримувати в особисті", callback_data=ChannelCallback(dm=True))
+    builder.adjust(1)
+
+    return builder.as_markup()
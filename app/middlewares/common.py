@@ -10,18 +10,15 @@ from database.services import User
 from database.services.referal import Referal
 from utils.base62 import decode_base62
 
+from .user import get_event_user
+
 
 class CommonMiddleware(BaseMiddleware):
     async def __call__(
         self, handler: Callable, message: Message | CallbackQuery, data: dict
     ) -> Any:
         session = data["session"]
-        user, is_create = await User.get_or_create(
-            session=session,
-            id=message.from_user.id,
-            username=message.from_user.username,
-            language=message.from_user.language_code,
-        )
+        user, is_create = await get_event_user(session, message.from_user)
 
         if user.status == UserStatus.Banned:
             return
@@ -1,99 +1,85 @@
 import asyncio
-from collections import defaultdict
-from datetime import datetime, timedelta
 from typing import Any, Callable
 
 from aiogram import BaseMiddleware
 from aiogram.types import CallbackQuery, Message
 
 from app.text import message_text as mt
-from database.services.user import User
+from data.config import tgbot
+from loader import i18n, redis_client
+from utils.cache import TTLCache
+from utils.logging import logger
+from utils.rate_limit import GCRALimiter, RedisGCRALimiter
 
 rate_limit: int = 3
 time_window: int = 1
+# Дольше этого времени отложенный запрос не ждет и просто отбрасывается
+max_defer: float = 5
+
+
+class ThrottlePolicy:
+    Drop = "drop"  # молча отбрасывать лишние запросы
+    ReplyOnce = "reply_once"  # предупредить один раз за серию лишних запросов
+    Defer = "defer"  # обработать позже, не удерживая сессию БД
 
 
 class ThrottlingMiddleware(BaseMiddleware):
     """
     Middleware для защиты от спама.
-    Ограничивает количество запросов от пользователя.
+    Ограничивает количество запросов от пользователя (GCRA, O(1) на запрос).
+    Если настроен Redis, лимит общий для всех инстансов бота.
     """
 
-    def __init__(self):
+    def __init__(self, policy: str = tgbot.THROTTLING_POLICY):
         """
         Args:
-            rate_limit: Количество разрешенных запросов
-            time_window: Временное окно в секундах
+            policy: Что делать с запросом сверх лимита (см. ThrottlePolicy)
         """
-        self.rate_limit = rate_limit
-        self.time_window = timedelta(seconds=time_window)
-        # Словарь для хранения последних запросов: {user_id: [timestamp1, timestamp2, ...]}
-        self.user_requests = defaultdict(list)
-        self.last_cleanup = datetime.now()
-        self.cleanup_interval = timedelta(minutes=5)  # Очистка каждые 5 минут
+        if redis_client is not None:
+            self.limiter = RedisGCRALimiter(redis_client, rate=rate_limit, period=time_window)
+        else:
+            self.limiter = GCRALimiter(rate=rate_limit, period=time_window)
+        self.policy = policy
+        # Пользователи, которых уже предупредили в текущей серии лишних запросов
+        self.warned = TTLCache(maxsize=10_000, ttl=60)
+        # Пользователи с уже отложенным запросом
+        self.deferred: set[int] = set()
         super().__init__()
 
-    def _cleanup_old_users(self, now: datetime) -> None:
-        """Удаляет записи неактивных пользователей"""
-        if now - self.last_cleanup < self.cleanup_interval:
-            return
-
-        # Удаляем пользователей без активных запросов
-        users_to_delete = []
-        for user_id, requests in self.user_requests.items():
-            # Удаляем старые запросы
-            requests[:] = [req_time for req_time in requests if now - req_time < self.time_window]
-            # Если запросов не осталось, помечаем пользователя для удаления
-            if not requests:
-                users_to_delete.append(user_id)
-
-        # Удаляем неактивных пользователей
-        for user_id in users_to_delete:
-            del self.user_requests[user_id]
-
-        self.last_cleanup = now
-
     async def __call__(
         self,
         handler: Callable,
         event: Message | CallbackQuery,
         data: dict[str, Any],
     ) -> Any:
-        session = data["session"]
         user_id = event.from_user.id
-        user = await User.get_by_id(session=session, id=user_id)
-        now = datetime.now()
-
-        # Периодическая очистка неактивных пользователей
-        self._cleanup_old_users(now)
-
-        # Получаем список запросов пользователя
-        requests = self.user_requests[user_id]
-
-        # Удаляем старые запросы за пределами временного окна
-        requests[:] = [req_time for req_time in requests if now - req_time < self.time_window]
-
-        # Проверяем лимит
-        if len(requests) >= self.rate_limit:
-            # Вычисляем время ожидания до следующего доступного запроса
-            oldest_request = min(requests)
-            wait_time = (oldest_request + self.time_window - now).total_seconds()
-
-            if wait_time > 0:
-                # Отправляем предупреждение
-                if isinstance(event, Message):
-                    await event.answer(mt.RATE_LIMIT_MESSAGE(language=user.language))
-
-                # Ждем и затем обрабатываем запрос
-                await asyncio.sleep(wait_time)
-
-                # Обновляем время для корректной обработки после ожидания
-                now = datetime.now()
-                requests[:] = [
-                    req_time for req_time in requests if now - req_time < self.time_window
-                ]
-
-        # Добавляем текущий запрос
-        requests.append(now)
-
-        return await handler(event, data)
+        wait_time = await self.limiter.check(user_id)
+
+        if not wait_time:
+            self.warned.pop(user_id)
+            return await handler(event, data)
+
+        if self.policy == ThrottlePolicy.ReplyOnce:
+            if not self.warned.get(user_id) and isinstance(event, Message):
+                self.warned.set(user_id, True)
+                language = event.from_user.language_code or i18n.default_locale
+                with i18n.use_locale(language):
+                    await event.answer(mt.RATE_LIMIT_MESSAGE)
+
+        elif self.policy == ThrottlePolicy.Defer:
+            if user_id not in self.deferred and wait_time <= max_defer:
+                self.deferred.add(user_id)
+                asyncio.create_task(self._feed_later(user_id, wait_time, data))
+
+        return None
+
+    async def _feed_later(self, user_id: int, delay: float, data: dict[str, Any]) -> None:
+        """Повторно передает апдейт диспетчеру после паузы (с новой сессией БД)"""
+        try:
+            await asyncio.sleep(delay)
+            self.deferred.discard(user_id)
+            await data["dispatcher"].feed_update(data["bot"], data["event_update"])
+        except Exception as e:
+            logger.error(f"Ошибка обработки отложенного запроса {user_id}: {e}")
+        finally:
+            self.deferred.discard(user_id)
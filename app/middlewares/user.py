@@ -2,22 +2,42 @@ from typing import Any, Callable
 
 from aiogram import BaseMiddleware
 from aiogram.types import CallbackQuery, Message
+from aiogram.types import User as TelegramUser
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.models.user import UserStatus
+from database.models.user import UserModel, UserStatus
 from database.services import User
+from utils.logging import logger
+
+
+async def get_event_user(
+    session: AsyncSession, from_user: TelegramUser
+) -> tuple[UserModel, bool]:
+    """
+    Пользователь апдейта (создается при первом обращении)
+    Общий для CommonMiddleware и UsersMiddleware: пользователь, который снова пишет боту
+    (в том числе /start после разблокировки), возвращается в рассылки
+
+    Returns:
+        (пользователь, создан ли он сейчас)
+    """
+    user, is_create = await User.get_or_create(
+        session=session,
+        id=from_user.id,
+        username=from_user.username,
+        language=from_user.language_code,
+    )
+    if not user.is_active and user.status != UserStatus.Banned:
+        user = await User.update(session=session, id=user.id, is_active=True)
+        logger.log("DATABASE", f"{user.id} (@{user.username}): снова активен")
+    return user, is_create
 
 
 class UsersMiddleware(BaseMiddleware):
     async def __call__(
         self, handler: Callable, message: Message | CallbackQuery, data: dict
     ) -> Any:
-        session = data["session"]
-        user, is_create = await User.get_or_create(
-            session=session,
-            id=message.from_user.id,
-            username=message.from_user.username,
-            language=message.from_user.language_code,
-        )
+        user, is_create = await get_event_user(data["session"], message.from_user)
         if user.status == UserStatus.Banned:
             return
 
@@ -32,6 +32,10 @@ class MessageText:
     def LOG_SENDING(self):
         return _("Logs sending...")
 
+    @property
+    def RATE_LIMIT_MESSAGE(self):
+        return _("Too many requests. Please wait a few seconds ⏳")
+
     @property
     def UNKNOWN_COMMAND(self):
         return _("Unknown command. If you are lost, type /start.")
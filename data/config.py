@@ -48,20 +48,51 @@ class TelegramBotSettings:
     MODERATOR_GROUP_ID: int = env.int("MODERATOR_GROUP_ID", default=None)
     BOT_CHANNEL_URL: str = env.str("BOT_CHANNEL_URL", default=None)
 
+    # Каналы групп: {группа: id канала} и ссылки для вступления {группа: ссылка}
+    GROUP_CHANNELS: dict = env.dict(
+        "GROUP_CHANNELS", default={}, subcast_keys=float, subcast_values=int
+    )
+    GROUP_CHANNEL_LINKS: dict = env.dict("GROUP_CHANNEL_LINKS", default={}, subcast_keys=float)
+
+    # drop / reply_once / defer
+    THROTTLING_POLICY: str = env.str("THROTTLING_POLICY", default="reply_once")
+
+    # Окно объединения уведомлений об изменениях одной группы, секунд (0 - отправлять сразу)
+    NOTIFY_WINDOW: int = env.int("NOTIFY_COALESCE_WINDOW", default=60)
+
+    # polling / webhook
+    RUN_MODE: str = env.str("RUN_MODE", default="polling")
+    # Адрес Bot API (например, локальный сервер или заглушка для тестов)
+    API_URL: str = env.str("TELEGRAM_API_URL", default=None)
+
     TIME_ZONE = "UTC"
 
     I18N_DOMAIN = "bot"
 
 
+# -< Webhook >-
+class WebhookSettings:
+    BASE_URL: str = env.str("WEBHOOK_URL", default=None)
+    PATH: str = env.str("WEBHOOK_PATH", default="/webhook")
+    # Обязателен: без него любой, кто узнал адрес, может присылать поддельные апдейты
+    SECRET: str = env.str("WEBHOOK_SECRET", default=None)
+
+    HOST: str = env.str("WEB_SERVER_HOST", default="0.0.0.0")
+    PORT: int = env.int("WEB_SERVER_PORT", default=8080)
+    # Позволяет нескольким процессам слушать один порт
+    REUSE_PORT: bool = env.bool("WEBHOOK_REUSE_PORT", default=False)
+
+
 # -< Path\Dir >-
 IMAGES_DIR = rf"{DIR}/images"
 LOCALES_DIR = f"{DIR}/data/locales"
-LOG_FILE_PATH: Path = DIR / "logs" / "logs.log"
+LOG_FILE_PATH: Path = env.path("LOG_FILE_PATH", default=DIR / "logs" / "logs.log")
 
 
 # -< Other >-
 database = DatabaseSettings()
 redis = RedisSettings()
 tgbot = TelegramBotSettings()
+webhook = WebhookSettings()
 
 schedule_url = "https://alerts.org.ua/kyivska-oblast/brovary/"
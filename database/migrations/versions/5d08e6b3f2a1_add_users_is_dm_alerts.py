@@ -0,0 +1,29 @@
+"""add users is_dm_alerts
+
+Revision ID: 5d08e6b3f2a1
+Revises: e3b95d0a7c42
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d08e6b3f2a1'
+down_revision: Union[str, None] = 'e3b95d0a7c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('is_dm_alerts', sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'is_dm_alerts')
@@ -0,0 +1,29 @@
+"""add users is_active
+
+Revision ID: a92c4e7d1b36
+Revises: 5d08e6b3f2a1
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a92c4e7d1b36'
+down_revision: Union[str, None] = '5d08e6b3f2a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'is_active')
@@ -0,0 +1,38 @@
+"""add schedule_archive table
+
+Revision ID: c7a2f4e91d08
+Revises: 8b4e6d21c5a3
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a2f4e91d08'
+down_revision: Union[str, None] = '8b4e6d21c5a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'schedule_archive',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('version', sa.String(length=64), nullable=False),
+        sa.Column('taken_at', sa.DateTime(), nullable=False),
+        sa.Column('is_keyframe', sa.Boolean(), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_schedule_archive_taken_at'), 'schedule_archive', ['taken_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_schedule_archive_taken_at'), table_name='schedule_archive')
+    op.drop_table('schedule_archive')
@@ -1,3 +1,7 @@
+from .live_message import LiveMessageModel
+from .outbox import OutboxModel
 from .referal import ReferalModel
+from .schedule_archive import ScheduleArchiveModel
+from .schedule_state import ScheduleStateModel
 from .shedule import SheduleModel
 from .user import UserModel
@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import BaseModel
+
+
+class LiveMessageModel(BaseModel):
+    """Сообщение с расписанием, которое обновляется вместо отправки новых (режим /live)"""
+
+    __tablename__ = "live_messages"
+
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    message_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    # День расписания (unix timestamp), для которого отправлено сообщение
+    day: Mapped[int] = mapped_column(BigInteger, nullable=True)
@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Integer, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import BaseModel
+
+
+class OutboxStatus:
+    Pending = 0
+    Sent = 1
+    Failed = 2
+    # Вытеснено более новой версией расписания до отправки
+    Cancelled = 3
+
+
+class OutboxModel(BaseModel):
+    __tablename__ = "outbox"
+    __table_args__ = (UniqueConstraint("user_id", "group", "version", name="uq_outbox_key"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    group: Mapped[str] = mapped_column(String(20), nullable=False)
+    version: Mapped[str] = mapped_column(String(64), nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[int] = mapped_column(Integer, server_default="0", index=True)
+    attempts: Mapped[int] = mapped_column(Integer, server_default="0")
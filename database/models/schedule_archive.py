@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import BaseModel
+
+
+class ScheduleArchiveModel(BaseModel):
+    __tablename__ = "schedule_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    version: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Когда версия получена (UTC)
+    taken_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    # Полный снимок масок или только изменения относительно предыдущей записи
+    is_keyframe: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
@@ -0,0 +1,14 @@
+from sqlalchemy import String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import BaseModel
+
+
+class ScheduleStateModel(BaseModel):
+    """Состояние обработки расписания, общее для всех инстансов бота"""
+
+    __tablename__ = "schedule_state"
+
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    # Сериализованное состояние (JSON)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
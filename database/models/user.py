@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, Float, Integer, String
+from sqlalchemy import BigInteger, Float, Index, Integer, String, false, true
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import BaseModel
@@ -15,6 +15,7 @@ class UserStatus:
 
 class UserModel(BaseModel):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_group_is_alerts", "group", "is_alerts"),)
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     username: Mapped[str] = mapped_column(String(70), nullable=True)
@@ -23,3 +24,7 @@ class UserModel(BaseModel):
     group: Mapped[float] = mapped_column(Float, nullable=True)
     status: Mapped[int] = mapped_column(Integer, server_default="1")
     is_alerts: Mapped[bool] = mapped_column(server_default="True", nullable=False)
+    # Уведомления в личные сообщения, даже если у группы есть канал
+    is_dm_alerts: Mapped[bool] = mapped_column(server_default=false(), nullable=False)
+    # False - бот заблокирован или чат удален, пользователь не получает рассылки
+    is_active: Mapped[bool] = mapped_column(server_default=true(), nullable=False)
@@ -1,8 +1,17 @@
-from sqlalchemy import delete
+from typing import Iterable, Sequence
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import Mapped
 
+# Диалекты с поддержкой INSERT ... ON CONFLICT
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
 
 class BaseService:
     model: Mapped = None
@@ -77,9 +86,77 @@ class BaseService:
         :param filters: Фильтры для поиска записи
         :return: (instance, created) - объект и флаг, создан ли он
         """
-        instance = await cls.get_all(session, **filters)
-        if instance:
-            return instance[0], False  # Возвращаем первую найденную запись
+        result = await session.execute(select(cls.model).filter_by(**filters).limit(1))
+        if instance := result.scalar_one_or_none():
+            return instance, False
         data = {**filters, **(defaults or {})}
         instance = await cls.create(session, **data)
         return instance, True
+
+    @classmethod
+    async def upsert(
+        cls,
+        session: AsyncSession,
+        values: dict,
+        conflict: Sequence[str] = ("id",),
+        update: Sequence[str] = (),
+        commit: bool = True,
+    ):
+        """
+        Вставляет запись одним запросом INSERT ... ON CONFLICT ... RETURNING.
+        :param values: Значения колонок
+        :param conflict: Колонки уникального ключа
+        :param update: Колонки, которые обновляются при конфликте (пусто - DO NOTHING)
+        :param commit: Зафиксировать транзакцию
+        :return: Вставленный (или обновлённый) объект, None - запись уже была и не обновлялась
+        """
+        instances = await cls.upsert_many(session, [values], conflict, update, commit=commit)
+        return instances[0] if instances else None
+
+    @classmethod
+    async def upsert_many(
+        cls,
+        session: AsyncSession,
+        rows: Iterable[dict],
+        conflict: Sequence[str] = ("id",),
+        update: Sequence[str] = (),
+        chunk_size: int = 1000,
+        commit: bool = True,
+    ) -> list:
+        """
+        Вставляет много записей пачками по {chunk_size} строк (PostgreSQL и SQLite).
+        :param rows: Значения колонок каждой записи
+        :param conflict: Колонки уникального ключа
+        :param update: Колонки, которые обновляются при конфликте (пусто - DO NOTHING)
+        :param chunk_size: Строк в одном запросе
+        :param commit: Зафиксировать транзакцию
+        :return: Вставленные и обновлённые объекты (пропущенные при DO NOTHING не возвращаются)
+        """
+        rows = list(rows)
+        insert = _UPSERT_INSERTS.get(session.bind.dialect.name)
+        if insert is None:
+            raise NotImplementedError(f"Upsert не поддерживается для {session.bind.dialect.name}")
+
+        stmt = insert(cls.model)
+        if update:
+            set_ = {column: stmt.excluded[column] for column in update}
+            if "updated_at" in cls.model.__table__.c:
+                # onupdate не срабатывает для ON CONFLICT DO UPDATE
+                set_.setdefault("updated_at", func.now())
+            stmt = stmt.on_conflict_do_update(index_elements=list(conflict), set_=set_)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict))
+        stmt = stmt.returning(cls.model)
+
+        instances = []
+        for i in range(0, len(rows), chunk_size):
+            result = await session.scalars(
+                stmt,
+                rows[i : i + chunk_size],
+                # Обновленные строки могут уже быть в сессии - перечитываем их из RETURNING
+                execution_options={"populate_existing": True},
+            )
+            instances.extend(result.all())
+        if commit:
+            await session.commit()
+        return instances
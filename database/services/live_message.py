@@ -0,0 +1,63 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models.live_message import LiveMessageModel
+from database.services.base import BaseService
+
+
+class LiveMessage(BaseService):
+    model = LiveMessageModel
+
+    @staticmethod
+    async def is_enabled(session: AsyncSession, user_id: int) -> bool:
+        return await session.get(LiveMessageModel, user_id) is not None
+
+    @staticmethod
+    async def enable(
+        session: AsyncSession, user_id: int, message_id: Optional[int], day: Optional[int]
+    ) -> None:
+        """Включает режим для пользователя (или заменяет сообщение)"""
+        await session.merge(LiveMessageModel(user_id=user_id, message_id=message_id, day=day))
+        await session.commit()
+
+    @staticmethod
+    async def disable(session: AsyncSession, user_id: int) -> None:
+        await session.execute(delete(LiveMessageModel).where(LiveMessageModel.user_id == user_id))
+        await session.commit()
+
+    @staticmethod
+    async def get_many(
+        session: AsyncSession, user_ids: Iterable[int]
+    ) -> dict[int, tuple[Optional[int], Optional[int]]]:
+        """
+        Сообщения пользователей, включивших режим
+
+        Returns:
+            Словарь {user_id: (message_id, день)}
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        result = await session.execute(
+            select(LiveMessageModel.user_id, LiveMessageModel.message_id, LiveMessageModel.day)
+            .where(LiveMessageModel.user_id.in_(user_ids))
+        )
+        return {user_id: (message_id, day) for user_id, message_id, day in result.all()}
+
+    @staticmethod
+    async def save_many(session: AsyncSession, message_ids: dict[int, int], day: int) -> None:
+        """Запоминает отправленные сообщения (пользователи, отключившие режим, пропускаются)"""
+        if not message_ids:
+            return
+        table = LiveMessageModel.__table__
+        # Core UPDATE (executemany): строк уже отключивших режим просто нет
+        stmt = (
+            update(table)
+            .where(table.c.user_id == bindparam("uid"))
+            .values(message_id=bindparam("mid"), day=day)
+        )
+        params = [{"uid": user_id, "mid": message_id} for user_id, message_id in message_ids.items()]
+        await session.execute(stmt, params)
+        await session.commit()
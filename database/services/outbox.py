@@ -0,0 +1,118 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models.outbox import OutboxModel, OutboxStatus
+from database.services.base import BaseService
+
+# Сколько строк вставлять одним запросом
+CHUNK_SIZE = 1000
+
+
+class Outbox(BaseService):
+    model = OutboxModel
+
+    @staticmethod
+    async def append(session: AsyncSession, rows: list[dict]) -> int:
+        """
+        Добавляет сообщения в очередь, пропуская уже существующие ключи (user_id, group, version)
+
+        Args:
+            session: Сессия БД
+            rows: Словари с полями user_id, group, version, text
+
+        Returns:
+            Количество добавленных сообщений
+        """
+        insert = (
+            postgresql_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+        )
+        added = 0
+        for start in range(0, len(rows), CHUNK_SIZE):
+            stmt = insert(OutboxModel).values(rows[start : start + CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "group", "version"])
+            result = await session.execute(stmt)
+            added += max(result.rowcount, 0)
+        await session.commit()
+        return added
+
+    @staticmethod
+    async def get_pending(session: AsyncSession, limit: int) -> list[tuple[int, int, str, str]]:
+        """Возвращает первые неотправленные сообщения: (id, user_id, text, version)"""
+        stmt = (
+            select(OutboxModel.id, OutboxModel.user_id, OutboxModel.text, OutboxModel.version)
+            .where(OutboxModel.status == OutboxStatus.Pending)
+            .order_by(OutboxModel.id)
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    @staticmethod
+    async def mark(
+        session: AsyncSession,
+        sent_ids: list[int],
+        failed_ids: list[int],
+        max_attempts: int,
+        dropped_ids: list[int] = (),
+    ) -> None:
+        """
+        Отмечает отправленные сообщения и увеличивает счетчик попыток у неудачных
+        ({dropped_ids} - недоставляемые без повторных попыток)
+        """
+        if sent_ids:
+            await session.execute(
+                update(OutboxModel)
+                .where(OutboxModel.id.in_(sent_ids))
+                .values(status=OutboxStatus.Sent)
+            )
+        if failed_ids:
+            await session.execute(
+                update(OutboxModel)
+                .where(OutboxModel.id.in_(failed_ids))
+                .values(attempts=OutboxModel.attempts + 1)
+            )
+            await session.execute(
+                update(OutboxModel)
+                .where(OutboxModel.id.in_(failed_ids))
+                .where(OutboxModel.attempts >= max_attempts)
+                .values(status=OutboxStatus.Failed)
+            )
+        if dropped_ids:
+            await session.execute(
+                update(OutboxModel)
+                .where(OutboxModel.id.in_(dropped_ids))
+                .values(status=OutboxStatus.Failed, attempts=OutboxModel.attempts + 1)
+            )
+        await session.commit()
+
+    @staticmethod
+    async def cancel_superseded(session: AsyncSession, groups: list[str], version: str) -> int:
+        """
+        Отменяет неотправленные сообщения групп {groups} с версией, отличной от {version}
+
+        Returns:
+            Количество отмененных сообщений
+        """
+        result = await session.execute(
+            update(OutboxModel)
+            .where(OutboxModel.group.in_(groups))
+            .where(OutboxModel.version != version)
+            .where(OutboxModel.status == OutboxStatus.Pending)
+            .values(status=OutboxStatus.Cancelled)
+        )
+        await session.commit()
+        return max(result.rowcount, 0)
+
+    @staticmethod
+    async def delete_processed_before(session: AsyncSession, border: datetime) -> None:
+        """Удаляет обработанные сообщения старше указанной даты"""
+        await session.execute(
+            delete(OutboxModel)
+            .where(OutboxModel.status != OutboxStatus.Pending)
+            .where(OutboxModel.updated_at < border)
+        )
+        await session.commit()
@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models.schedule_archive import ScheduleArchiveModel
+from database.services.base import BaseService
+
+# Запись архива: (id, время получения, ключевой кадр, данные)
+ArchiveRow = tuple[int, datetime, bool, bytes]
+
+
+class ScheduleArchive(BaseService):
+    model = ScheduleArchiveModel
+
+    @staticmethod
+    async def append(
+        session: AsyncSession, version: str, taken_at: datetime, is_keyframe: bool, payload: bytes
+    ) -> int:
+        """Добавляет версию в архив и возвращает id записи"""
+        row = ScheduleArchiveModel(
+            version=version, taken_at=taken_at, is_keyframe=is_keyframe, payload=payload
+        )
+        session.add(row)
+        await session.commit()
+        return row.id
+
+    @staticmethod
+    async def get_last_id(session: AsyncSession) -> Optional[int]:
+        """id последней записи архива"""
+        return await session.scalar(select(func.max(ScheduleArchiveModel.id)))
+
+    @staticmethod
+    async def _keyframe_id(session: AsyncSession, moment: Optional[datetime]) -> Optional[int]:
+        """id последнего ключевого кадра, полученного не позже {moment}"""
+        stmt = select(func.max(ScheduleArchiveModel.id)).where(ScheduleArchiveModel.is_keyframe)
+        if moment is not None:
+            stmt = stmt.where(ScheduleArchiveModel.taken_at <= moment)
+        return await session.scalar(stmt)
+
+    @staticmethod
+    async def get_chain(
+        session: AsyncSession, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> list[ArchiveRow]:
+        """
+        Записи, из которых восстанавливается состояние: ключевой кадр и изменения после него
+
+        Args:
+            session: Сессия БД
+            since: Начало периода - цепочка начинается с ключевого кадра перед ним
+                (по умолчанию с последнего кадра не позже {until})
+            until: Конец периода (по умолчанию - все записи)
+        """
+        keyframe_id = await ScheduleArchive._keyframe_id(session, since or until)
+        if keyframe_id is None:
+            if since is None:
+                return []
+            # Период начинается раньше архива - берем все записи
+            keyframe_id = 0
+
+        stmt = (
+            select(
+                ScheduleArchiveModel.id,
+                ScheduleArchiveModel.taken_at,
+                ScheduleArchiveModel.is_keyframe,
+                ScheduleArchiveModel.payload,
+            )
+            .where(ScheduleArchiveModel.id >= keyframe_id)
+            .order_by(ScheduleArchiveModel.id)
+        )
+        if until is not None:
+            stmt = stmt.where(ScheduleArchiveModel.taken_at <= until)
+        result = await session.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    @staticmethod
+    async def delete_before(session: AsyncSession, border: datetime) -> int:
+        """
+        Удаляет записи старше {border}, оставляя ключевой кадр,
+        от которого восстанавливаются оставшиеся записи
+
+        Returns:
+            Количество удаленных записей
+        """
+        keyframe_id = await ScheduleArchive._keyframe_id(session, border)
+        if keyframe_id is None:
+            return 0
+        result = await session.execute(
+            delete(ScheduleArchiveModel).where(ScheduleArchiveModel.id < keyframe_id)
+        )
+        await session.commit()
+        return max(result.rowcount, 0)
+
+    @staticmethod
+    async def get_size(session: AsyncSession) -> tuple[int, int]:
+        """Количество записей и суммарный размер данных в байтах"""
+        result = await session.execute(
+            select(
+                func.count(ScheduleArchiveModel.id),
+                func.coalesce(func.sum(func.length(ScheduleArchiveModel.payload)), 0),
+            )
+        )
+        count, size = result.one()
+        return count, size
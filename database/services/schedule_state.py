@@ -0,0 +1,22 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models.schedule_state import ScheduleStateModel
+from database.services.base import BaseService
+
+
+class ScheduleState(BaseService):
+    model = ScheduleStateModel
+
+    @staticmethod
+    async def load(session: AsyncSession, name: str) -> Optional[str]:
+        """Сохраненное состояние или None"""
+        row = await session.get(ScheduleStateModel, name, populate_existing=True)
+        return row.payload if row is not None else None
+
+    @staticmethod
+    async def save(session: AsyncSession, name: str, payload: str) -> None:
+        """Сохраняет (или заменяет) состояние"""
+        await session.merge(ScheduleStateModel(name=name, payload=payload))
+        await session.commit()
@@ -0,0 +1,90 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models.user import UserModel, UserStatus
+from database.services.base import BaseService
+from utils.cache import TTLCache
+
+# Сколько секунд показывать посчитанную статистику
+STATS_TTL: float = 60
+
+_cache = TTLCache(maxsize=1, ttl=STATS_TTL)
+
+
+class UserStats:
+    """Сводка по пользователям"""
+
+    __slots__ = (
+        "total",
+        "alerts",
+        "banned",
+        "inactive",
+        "new_today",
+        "new_week",
+        "groups",
+        "languages",
+        "created_at",
+    )
+
+    def __init__(self):
+        self.total = 0
+        self.alerts = 0
+        self.banned = 0
+        self.inactive = 0
+        self.new_today = 0
+        self.new_week = 0
+        # Количество пользователей по группам и языкам (None - не указано)
+        self.groups: Counter = Counter()
+        self.languages: Counter = Counter()
+        self.created_at = datetime.now(timezone.utc)
+
+
+class Stats(BaseService):
+    model = UserModel
+
+    @staticmethod
+    async def get_user_stats(session: AsyncSession, use_cache: bool = True) -> UserStats:
+        """
+        Считает статистику пользователей одним запросом с агрегатами
+
+        Строки группируются по (группа, язык), итоги по группам и языкам
+        складываются из этих строк (их не больше, чем групп x языков).
+        """
+        if use_cache and (stats := _cache.get("users")) is not None:
+            return stats
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        def count_if(condition):
+            return func.sum(case((condition, 1), else_=0))
+
+        result = await session.execute(
+            select(
+                UserModel.group,
+                UserModel.language,
+                func.count(),
+                count_if(UserModel.is_alerts == True),
+                count_if(UserModel.status == UserStatus.Banned),
+                count_if(UserModel.is_active == False),
+                count_if(UserModel.created_at >= today),
+                count_if(UserModel.created_at >= now - timedelta(days=7)),
+            ).group_by(UserModel.group, UserModel.language)
+        )
+
+        stats = UserStats()
+        for group, language, total, alerts, banned, inactive, new_today, new_week in result:
+            stats.total += total
+            stats.alerts += alerts
+            stats.banned += banned
+            stats.inactive += inactive
+            stats.new_today += new_today
+            stats.new_week += new_week
+            stats.groups[group] += total
+            stats.languages[language] += total
+
+        _cache.set("users", stats)
+        return stats
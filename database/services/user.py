@@ -1,7 +1,11 @@
-from sqlalchemy import select
+from collections import defaultdict
+from typing import Iterable
+
+from sqlalchemy import or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.services.base import BaseService
+from database.services.user_cache import user_cache
 from utils.logging import logger
 
 from ..models.user import UserModel
@@ -10,14 +14,42 @@ from ..models.user import UserModel
 class User(BaseService):
     model = UserModel
 
+    @staticmethod
+    async def get_cached(session: AsyncSession, id: int) -> UserModel | None:
+        """Получает пользователя из кеша, при промахе - из БД (с сохранением в кеш)"""
+        if user := await user_cache.get(session, id):
+            return user
+        if user := await User.get_by_id(session, id):
+            await user_cache.set(user)
+        return user
+
     async def get_or_create(
         session: AsyncSession, id: int, username: str = None, language: str = None
     ) -> UserModel:
-        if user := await User.get_by_id(session, id):
+        if user := await User.get_cached(session, id):
             return user, False
-        await User.create(session, id=id, username=username, language=language)
-        user = await User.get_by_id(session, id)
-        return user, True
+        # Одна вставка с RETURNING вместо create + get
+        user = await User.upsert(session, {"id": id, "username": username, "language": language})
+        created = user is not None
+        if not created:
+            # Параллельный апдейт (webhook) уже создал этого пользователя
+            user = await User.get_by_id(session, id)
+        await user_cache.set(user)
+        return user, created
+
+    @classmethod
+    async def update(cls, session: AsyncSession, id: int, **kwargs):
+        """Обновляет пользователя и сбрасывает его запись в кеше"""
+        instance = await super().update(session, id, **kwargs)
+        await user_cache.invalidate(id)
+        return instance
+
+    @classmethod
+    async def delete(cls, session: AsyncSession, id: int):
+        """Удаляет пользователя и сбрасывает его запись в кеше"""
+        instance = await super().delete(session, id)
+        await user_cache.invalidate(id)
+        return instance
 
     @staticmethod
     async def increment_referral_count(
@@ -26,8 +58,114 @@ class User(BaseService):
         """Добавляет приведенного реферала к пользователю {inviter_id}"""
         user.referral += num
         await session.commit()
+        await user_cache.invalidate(user.id)
         logger.log("DATABASE", f"{user.id} (@{user.username}): привел нового пользователя")
 
+    @staticmethod
+    async def get_subscribers_by_groups(
+        session: AsyncSession,
+        groups: Iterable[float],
+        chunk_size: int = 1000,
+        channel_groups: Iterable[float] = (),
+    ) -> dict[float, list[tuple[int, str]]]:
+        """
+        Получает подписчиков уведомлений сразу для нескольких групп одним запросом
+
+        Args:
+            session: Сессия БД
+            groups: Номера групп (например, 3.1)
+            chunk_size: Сколько строк читать с сервера за раз
+            channel_groups: Группы с каналом - из них только те, кто просит личные сообщения
+
+        Returns:
+            Словарь {группа: [(id, язык), ...]}
+        """
+        groups = list(groups)
+        subscribers = defaultdict(list)
+        if not groups:
+            return subscribers
+
+        stmt = (
+            select(UserModel.id, UserModel.group, UserModel.language)
+            .where(UserModel.group.in_(groups))
+            .where(UserModel.is_alerts == True)
+            .where(UserModel.is_active == True)
+            .execution_options(yield_per=chunk_size)
+        )
+        if channel_groups := list(channel_groups):
+            stmt = stmt.where(
+                or_(UserModel.group.not_in(channel_groups), UserModel.is_dm_alerts == True)
+            )
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            for user_id, group, language in partition:
+                subscribers[group].append((user_id, language))
+
+        return subscribers
+
+    @staticmethod
+    async def set_status_many(
+        session: AsyncSession,
+        ids: Iterable[int],
+        status: int,
+        from_status: int | None = None,
+        chunk_size: int = 1000,
+    ) -> list[int]:
+        """
+        Меняет статус многих пользователей запросами UPDATE ... WHERE id IN (...)
+
+        Args:
+            session: Сессия БД
+            ids: id пользователей
+            status: Новый статус
+            from_status: Менять только пользователей с этим статусом
+            chunk_size: Сколько id в одном запросе
+
+        Returns:
+            id пользователей, статус которых изменился
+        """
+        ids = list(dict.fromkeys(ids))
+        changed = []
+        for i in range(0, len(ids), chunk_size):
+            stmt = (
+                update(UserModel)
+                .where(UserModel.id.in_(ids[i : i + chunk_size]))
+                .where(UserModel.status != status)
+                .values(status=status)
+                .returning(UserModel.id)
+            )
+            if from_status is not None:
+                stmt = stmt.where(UserModel.status == from_status)
+            changed.extend((await session.scalars(stmt)).all())
+        await session.commit()
+        await user_cache.invalidate_many(changed)
+        logger.log("DATABASE", f"Статус {status} установлен {len(changed)} пользователям")
+        return changed
+
+    @staticmethod
+    async def deactivate_many(
+        session: AsyncSession, ids: Iterable[int], chunk_size: int = 1000
+    ) -> int:
+        """
+        Отмечает пользователей неактивными (бот заблокирован или чат не найден)
+
+        Returns:
+            Количество пользователей, которые были активны
+        """
+        ids = list(ids)
+        deactivated = 0
+        for i in range(0, len(ids), chunk_size):
+            result = await session.execute(
+                update(UserModel)
+                .where(UserModel.id.in_(ids[i : i + chunk_size]))
+                .where(UserModel.is_active == True)
+                .values(is_active=False)
+            )
+            deactivated += max(result.rowcount, 0)
+        await session.commit()
+        await user_cache.invalidate_many(ids)
+        return deactivated
+
     @staticmethod
     async def get_users_by_line(session: AsyncSession, line: str | float) -> list[UserModel]:
         """
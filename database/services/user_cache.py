@@ -0,0 +1,103 @@
+import json
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from utils.cache import TTLCache
+from utils.logging import logger
+
+from ..models.user import UserModel
+
+# Время жизни записи в памяти процесса, секунд
+LOCAL_TTL: float = 300
+# Если включен Redis, локальная копия живет недолго, чтобы другие инстансы видели изменения
+LOCAL_TTL_WITH_REDIS: float = 10
+REDIS_TTL: int = 600
+MAXSIZE: int = 50_000
+
+REDIS_PREFIX = "user:"
+
+_COLUMNS = tuple(attr.key for attr in inspect(UserModel).column_attrs)
+_DATETIME_COLUMNS = ("created_at", "updated_at")
+
+
+class UserCache:
+    """
+    Кеш пользователей: LRU с TTL в памяти процесса и, опционально, Redis.
+    Хранятся значения колонок, при чтении из них собирается объект,
+    привязанный к сессии запроса без обращения к БД.
+    """
+
+    def __init__(self):
+        self.local = TTLCache(maxsize=MAXSIZE, ttl=LOCAL_TTL)
+        self.redis = None
+
+    def attach_redis(self, redis) -> None:
+        """Подключает Redis как второй уровень кеша"""
+        self.redis = redis
+        self.local.ttl = LOCAL_TTL_WITH_REDIS
+
+    async def get(self, session: AsyncSession, id: int) -> Optional[UserModel]:
+        values = self.local.get(id)
+
+        if values is None and self.redis is not None:
+            try:
+                if raw := await self.redis.get(f"{REDIS_PREFIX}{id}"):
+                    values = self._loads(raw)
+                    self.local.set(id, values)
+            except Exception as e:
+                logger.error(f"Ошибка чтения пользователя {id} из Redis: {e}")
+
+        # Запись без новых колонок (сохранена до миграции) считается промахом
+        if values is None or len(values) != len(_COLUMNS):
+            return None
+
+        instance = UserModel(**values)
+        make_transient_to_detached(instance)
+        return await session.merge(instance, load=False)
+
+    async def set(self, user: UserModel) -> None:
+        values = {key: getattr(user, key) for key in _COLUMNS}
+        self.local.set(user.id, values)
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(f"{REDIS_PREFIX}{user.id}", self._dumps(values), ex=REDIS_TTL)
+            except Exception as e:
+                logger.error(f"Ошибка записи пользователя {user.id} в Redis: {e}")
+
+    async def invalidate(self, *ids: int) -> None:
+        await self.invalidate_many(ids)
+
+    async def invalidate_many(self, ids: Iterable[int]) -> None:
+        ids = list(ids)
+        for id in ids:
+            self.local.pop(id)
+
+        if self.redis is not None and ids:
+            try:
+                await self.redis.delete(*(f"{REDIS_PREFIX}{id}" for id in ids))
+            except Exception as e:
+                logger.error(f"Ошибка удаления пользователей из Redis: {e}")
+
+    @staticmethod
+    def _dumps(values: dict) -> str:
+        values = dict(values)
+        for key in _DATETIME_COLUMNS:
+            if values.get(key) is not None:
+                values[key] = values[key].isoformat()
+        return json.dumps(values)
+
+    @staticmethod
+    def _loads(raw: bytes | str) -> dict:
+        values = json.loads(raw)
+        for key in _DATETIME_COLUMNS:
+            if values.get(key) is not None:
+                values[key] = datetime.fromisoformat(values[key])
+        return values
+
+
+user_cache = UserCache()
@@ -2,20 +2,26 @@ from aiogram import Bot, Dispatcher
 from aiogram.client.bot import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.utils.i18n import I18n
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from data.config import LOCALES_DIR, redis, tgbot
+from database.services.user_cache import user_cache
 from utils.logging import logger
+from utils.priority_session import PrioritySession
 
 # -< FSM Storage>-
 if redis.URL:
     from aiogram.fsm.storage.redis import RedisStorage
     from redis.asyncio.client import Redis
 
-    storage = RedisStorage(Redis.from_url(redis.URL))
+    redis_client = Redis.from_url(redis.URL)
+    storage = RedisStorage(redis_client)
+    user_cache.attach_redis(redis_client)
     logger.log("BOT", "Storage: Redis")
 elif not redis.URL:
     from aiogram.fsm.storage.memory import MemoryStorage
 
+    redis_client = None
     storage = MemoryStorage()
     logger.log("BOT", "Storage: Default")
 
@@ -23,13 +29,26 @@ elif not redis.URL:
 bot_properties = DefaultBotProperties(
     parse_mode=ParseMode.HTML,
 )
+# Ответы пользователям получают приоритет над рассылками в общем лимите запросов
+if tgbot.API_URL:
+    from aiogram.client.telegram import TelegramAPIServer
+
+    session = PrioritySession(api=TelegramAPIServer.from_base(tgbot.API_URL))
+    logger.log("BOT", f"Bot API: {tgbot.API_URL}")
+else:
+    session = PrioritySession()
+
 bot = Bot(
     token=tgbot.BOT_TOKEN,
+    session=session,
     default=bot_properties,
 )
 
 dp = Dispatcher(bot=bot, storage=storage)
 
+# -< Scheduler >-
+scheduler = AsyncIOScheduler(timezone=tgbot.TIME_ZONE)
+
 i18n = I18n(path=LOCALES_DIR, domain=tgbot.I18N_DOMAIN, default_locale="en")
 _ = i18n.gettext
 __ = i18n.lazy_gettext
@@ -1,53 +1,26 @@
 import asyncio
+import re
 
 from aiogram.methods import DeleteWebhook
-
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from app.business.github_schedule_monitor import github_schedule_monitor
+from app.business.leader import leader
+from app.business.outbox import outbox_worker
+from app.business.reminders import reminder_scheduler
+from app.business.schedule_archive import schedule_archive
+from app.business.schedule_pipeline import schedule_pipeline
 from app.commands import set_default_commands
 from app.handlers import setup_handlers
 from app.middlewares import setup_middlewares
-from data.config import tgbot
+from data.config import tgbot, webhook
 from database.services.user import User
-from loader import bot, dp
+from loader import bot, dp, scheduler
 from utils.logging import logger
 
-
-async def github_schedule_loader_task():
-    """Фоновая задача для загрузки расписания с GitHub каждые 20 минут"""
-    from utils.github_schedule import download_schedule_from_github
-
-    # Загружаем сразу при старте
-    logger.log("GITHUB", "Первоначальная загрузка расписания с GitHub")
-    download_schedule_from_github()
-
-    while True:
-        try:
-            # Ждем 20 минут (1200 секунд)
-            await asyncio.sleep(1200)
-
-            # Загружаем расписание
-            download_schedule_from_github()
-        except Exception as e:
-            logger.error(f"Ошибка в задаче загрузки расписания с GitHub: {e}")
-
-
-async def github_schedule_checker_task():
-    """Фоновая задача для проверки изменений в GitHub расписании каждые 20 минут"""
-    from app.business.github_schedule_monitor import github_schedule_monitor
-    from database.connect import async_session
-
-    # Ждем 2 минуты после запуска бота перед первой проверкой
-    # (даем время на первую загрузку)
-    await asyncio.sleep(120)
-
-    while True:
-        try:
-            async with async_session() as session:
-                await github_schedule_monitor.check_and_notify(session)
-        except Exception as e:
-            logger.error(f"Ошибка в задаче проверки GitHub расписания: {e}")
-
-        # Ждем 20 минут (1200 секунд)
-        await asyncio.sleep(1200)
+# Допустимый secret_token для setWebhook
+WEBHOOK_SECRET_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,256}")
 
 
 async def schedule_checker_task():
@@ -71,12 +44,19 @@ async def schedule_checker_task():
 
 async def on_startup() -> None:
     await set_default_commands()
+    # История для статистики отключений переживает перезапуск
+    await schedule_archive.restore_history()
 
-    # Запускаем фоновую задачу загрузки расписания с GitHub
-    asyncio.create_task(github_schedule_loader_task())
+    # Загрузка расписания с GitHub работает на каждом инстансе (расписание в памяти
+    # нужно для ответов пользователям), сравнение и постановку уведомлений выполняет лидер
+    # Рассылка уведомлений из очереди (продолжает прерванную рассылку) - только на лидере
+    leader.add_task(outbox_worker.run)
+    # Напоминания о ближайших отключениях - тоже только на лидере
+    leader.add_task(reminder_scheduler.run)
+    asyncio.create_task(leader.run())
 
-    # Запускаем фоновую задачу проверки изменений GitHub расписания
-    asyncio.create_task(github_schedule_checker_task())
+    schedule_pipeline.start()
+    scheduler.start()
 
     # Запускаем фоновую задачу проверки расписания (старый метод)
     # asyncio.create_task(schedule_checker_task())
@@ -85,18 +65,70 @@ async def on_startup() -> None:
 
 
 async def on_shutdown() -> None:
+    from database.connect import async_engine
+    from utils.github_fetcher import github_fetcher
+
+    scheduler.shutdown(wait=False)
+    # Отложенные уведомления сохраняются в очередь, их отправит следующий лидер
+    await github_schedule_monitor.coalescer.flush(force=True)
+    await leader.resign()
+    await github_fetcher.close()
+    await async_engine.dispose()
     logger.log("BOT", "~ Bot shutting down...")
 
 
-async def main():
+async def on_webhook_startup() -> None:
+    await bot.set_webhook(
+        url=f"{webhook.BASE_URL}{webhook.PATH}",
+        secret_token=webhook.SECRET,
+        drop_pending_updates=tgbot.SKIP_UPDATES,
+    )
+    logger.log("BOT", f"~ Webhook: {webhook.BASE_URL}{webhook.PATH}")
+
+
+def setup_dispatcher() -> None:
     setup_middlewares(dp)
     setup_handlers(dp)
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
 
+
+async def main():
+    setup_dispatcher()
+
     await bot(DeleteWebhook(drop_pending_updates=tgbot.SKIP_UPDATES))
     await dp.start_polling(bot)
 
 
+def check_webhook_secret(secret: str | None) -> None:
+    """Не дает запустить webhook без секрета (Telegram присылает его в каждом запросе)"""
+    if not secret:
+        raise SystemExit("WEBHOOK_SECRET is required in webhook mode")
+    if not WEBHOOK_SECRET_PATTERN.fullmatch(secret):
+        raise SystemExit("WEBHOOK_SECRET must be 1-256 characters: A-Z, a-z, 0-9, '_' and '-'")
+
+
+def main_webhook():
+    """Запуск через aiohttp сервер: апдейты приходят от Telegram и обрабатываются в задачах"""
+    check_webhook_secret(webhook.SECRET)
+    setup_dispatcher()
+    if webhook.BASE_URL:
+        dp.startup.register(on_webhook_startup)
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=True,
+        secret_token=webhook.SECRET,
+    ).register(app, path=webhook.PATH)
+    setup_application(app, dp, bot=bot)
+
+    web.run_app(app, host=webhook.HOST, port=webhook.PORT, reuse_port=webhook.REUSE_PORT)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    if tgbot.RUN_MODE == "webhook":
+        main_webhook()
+    else:
+        asyncio.run(main())
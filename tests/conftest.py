@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Настройки читаются при импорте data.config - задаем их до импорта модулей бота
+_TMP = Path(tempfile.mkdtemp(prefix="light-schedule-tests-"))
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:TEST-TOKEN-AAAAAAAAAAAAAAAAAAAAAAAAAAA")
+os.environ.setdefault("DB_URL", f"sqlite+aiosqlite:///{_TMP / 'test.sqlite3'}")
+os.environ.setdefault("LOG_FILE_PATH", str(_TMP / "logs.log"))
+os.environ.setdefault("NOTIFY_COALESCE_WINDOW", "0")
+
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent))
+
+
+@pytest.fixture
+async def db():
+    """Пустые таблицы в тестовой БД"""
+    from database.connect import async_engine
+    from database.models.base import BaseModel
+
+    async with async_engine.begin() as connection:
+        await connection.run_sync(BaseModel.metadata.drop_all)
+        await connection.run_sync(BaseModel.metadata.create_all)
+    yield
+    await async_engine.dispose()
@@ -0,0 +1,87 @@
+import pytest
+
+import app.business.coalescer as coalescer_module
+from app.business.coalescer import NotificationCoalescer
+from database.connect import async_session
+from tests.test_schedule_monitor import make_data
+from utils.schedule_store import ScheduleStore
+
+
+@pytest.fixture
+def snapshot(db, monkeypatch):
+    store = ScheduleStore()
+    snapshot = store.replace(make_data(**{"1_1": "no", "1_2": "no"}))
+    monkeypatch.setattr(coalescer_module, "schedule_store", store)
+    return snapshot
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def make_coalescer(sent):
+    """Коалесцеры, как в разных процессах бота (таймеры отменяются после теста)"""
+    coalescers = []
+
+    async def send(session, groups, snapshot):
+        sent.append(set(groups))
+        return len(groups)
+
+    def make() -> NotificationCoalescer:
+        coalescers.append(NotificationCoalescer(send, window=60))
+        return coalescers[-1]
+
+    yield make
+    for coalescer in coalescers:
+        if coalescer._timer is not None:
+            coalescer._timer.cancel()
+
+
+async def test_pending_groups_survive_restart(snapshot, make_coalescer, sent):
+    async with async_session() as session:
+        assert await make_coalescer().add(session, {"GPV1.1"}, snapshot) == 0
+
+        # Процесс перезапустился до закрытия окна
+        restarted = make_coalescer()
+        await restarted.restore(session)
+
+    assert await restarted.flush(force=True) == 1
+    assert sent == [{"GPV1.1"}]
+
+    # Поставленные в очередь группы удалены из сохраненного состояния
+    async with async_session() as session:
+        again = make_coalescer()
+        await again.restore(session)
+    assert await again.flush(force=True) == 0
+
+
+async def test_window_continues_after_restart(snapshot, make_coalescer, sent):
+    async with async_session() as session:
+        await make_coalescer().add(session, {"GPV1.1", "GPV1.2"}, snapshot)
+        restarted = make_coalescer()
+        await restarted.restore(session)
+
+    # Окно еще не закрылось - отправлять рано
+    assert await restarted.flush() == 0
+    assert sent == []
+    assert restarted._timer is not None and not restarted._timer.done()
+
+
+async def test_failed_flush_keeps_groups(snapshot, make_coalescer, sent, monkeypatch):
+    coalescer = make_coalescer()
+    async with async_session() as session:
+        await coalescer.add(session, {"GPV1.1"}, snapshot)
+
+    async def broken(*args):
+        raise RuntimeError("db is down")
+
+    monkeypatch.setattr(coalescer, "_deliver", broken)
+    assert await coalescer.flush(force=True) == 0
+
+    async with async_session() as session:
+        restarted = make_coalescer()
+        await restarted.restore(session)
+    assert await restarted.flush(force=True) == 1
+    assert sent == [{"GPV1.1"}]
@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import utils.github_fetcher as github_fetcher_module
+from utils.github_fetcher import GitHubScheduleFetcher
+
+SCHEDULE = {"lastUpdated": "v1", "fact": {"today": 0, "data": {}}}
+ETAG = '"v1"'
+
+
+@pytest.fixture
+def replaced(monkeypatch):
+    """Снимки, переданные в schedule_store.replace"""
+    calls = []
+    monkeypatch.setattr(github_fetcher_module.schedule_store, "replace", calls.append)
+    return calls
+
+
+@pytest.fixture
+async def server():
+    """HTTP-заглушка GitHub: ответы задаются списком {state["responses"]}"""
+    state = {"responses": [], "requests": []}
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        state["requests"].append(dict(request.headers))
+        response = state["responses"].pop(0) if state["responses"] else "ok"
+        if response == "slow":
+            await asyncio.sleep(1)
+            response = "ok"
+        if response == "ok":
+            if request.headers.get("If-None-Match") == ETAG:
+                return web.Response(status=304)
+            return web.json_response(SCHEDULE, headers={"ETag": ETAG})
+        return web.Response(status=response)
+
+    app = web.Application()
+    app.router.add_get("/kyiv-region.json", handler)
+    server = TestServer(app)
+    await server.start_server()
+    state["url"] = str(server.make_url("/kyiv-region.json"))
+    yield state
+    await server.close()
+
+
+@pytest.fixture
+async def make_fetcher(tmp_path):
+    fetchers = []
+
+    def make(url: str, **kwargs) -> GitHubScheduleFetcher:
+        kwargs.setdefault("backoff", 0)
+        fetcher = GitHubScheduleFetcher(url=url, schedule_file=tmp_path / "schedule.json", **kwargs)
+        fetchers.append(fetcher)
+        return fetcher
+
+    yield make
+    for fetcher in fetchers:
+        await fetcher.close()
+
+
+async def test_200_saves_and_publishes(server, make_fetcher, replaced, tmp_path):
+    fetcher = make_fetcher(server["url"])
+
+    assert await fetcher.fetch() == SCHEDULE
+    assert fetcher.etag == ETAG
+    assert replaced == [SCHEDULE]
+    assert json.loads((tmp_path / "schedule.json").read_text(encoding="utf-8")) == SCHEDULE
+
+
+async def test_304_when_not_modified(server, make_fetcher, replaced):
+    fetcher = make_fetcher(server["url"])
+    await fetcher.fetch()
+
+    assert await fetcher.fetch() is None
+    assert server["requests"][-1]["If-None-Match"] == ETAG
+    assert len(replaced) == 1
+
+
+async def test_retries_5xx(server, make_fetcher, replaced):
+    server["responses"] = [503, 502, "ok"]
+    fetcher = make_fetcher(server["url"], retries=3)
+
+    assert await fetcher.fetch() == SCHEDULE
+    assert len(server["requests"]) == 3
+
+
+async def test_gives_up_after_retries(server, make_fetcher, replaced):
+    server["responses"] = [500, 500, 500]
+    fetcher = make_fetcher(server["url"], retries=2)
+
+    assert await fetcher.fetch() is None
+    assert len(server["requests"]) == 2
+    assert replaced == []
+
+
+async def test_4xx_is_not_retried(server, make_fetcher, replaced):
+    server["responses"] = [404]
+    fetcher = make_fetcher(server["url"], retries=3)
+
+    assert await fetcher.fetch() is None
+    assert len(server["requests"]) == 1
+
+
+async def test_timeout_is_retried(server, make_fetcher, replaced):
+    server["responses"] = ["slow", "ok"]
+    fetcher = make_fetcher(server["url"], timeout=0.2, retries=2)
+
+    assert await fetcher.fetch() == SCHEDULE
+    assert len(server["requests"]) == 2
+
+
+async def test_timeout_on_every_attempt(server, make_fetcher, replaced):
+    server["responses"] = ["slow", "slow"]
+    fetcher = make_fetcher(server["url"], timeout=0.2, retries=2)
+
+    assert await fetcher.fetch() is None
+    assert replaced == []
@@ -0,0 +1,34 @@
+import asyncio
+
+from app.business.leader import LeaderElector, LocalLease
+
+
+class BusyLease(LocalLease):
+    """Аренду держит другой инстанс"""
+
+    async def acquire(self) -> bool:
+        return False
+
+
+async def run_elector(lease) -> bool:
+    elector = LeaderElector(lease, interval=0.01)
+    task = asyncio.create_task(elector.run())
+    try:
+        return await elector.wait_decided(timeout=1)
+    finally:
+        await elector.resign()
+        task.cancel()
+
+
+async def test_wait_decided_reports_leader():
+    assert await run_elector(LocalLease()) is True
+
+
+async def test_wait_decided_reports_follower():
+    assert await run_elector(BusyLease()) is False
+
+
+async def test_wait_decided_gives_up_without_election():
+    elector = LeaderElector(LocalLease())
+
+    assert await elector.wait_decided(timeout=0.01) is False
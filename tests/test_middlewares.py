@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.middlewares.common import CommonMiddleware
+from app.middlewares.user import UsersMiddleware
+from database.connect import async_session
+from database.services import User
+
+USER_ID = 1001
+
+
+def make_message():
+    return SimpleNamespace(
+        from_user=SimpleNamespace(id=USER_ID, username="user", language_code="uk")
+    )
+
+
+@pytest.mark.parametrize("middleware_class", [CommonMiddleware, UsersMiddleware])
+async def test_inactive_user_becomes_active(db, middleware_class):
+    """Пользователь разблокировал бота и прислал /start (или любую команду)"""
+    async with async_session() as session:
+        await User.get_or_create(session=session, id=USER_ID, username="user", language="uk")
+        await User.update(session=session, id=USER_ID, is_active=False)
+
+    handled = []
+
+    async def handler(message, data):
+        handled.append(data["user"])
+
+    async with async_session() as session:
+        await middleware_class()(handler, make_message(), {"session": session})
+
+    async with async_session() as session:
+        user = await User.get_by_id(session, USER_ID)
+
+    assert handled and handled[0].is_active
+    assert user.is_active
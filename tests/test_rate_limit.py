@@ -0,0 +1,91 @@
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+import utils.rate_limit as rate_limit_module
+from utils.rate_limit import NS, GCRALimiter, RedisGCRALimiter
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def warnings(monkeypatch):
+    messages = []
+    monkeypatch.setattr(rate_limit_module.logger, "warning", messages.append)
+    return messages
+
+
+def make_limiter(server, **kwargs) -> RedisGCRALimiter:
+    kwargs.setdefault("rate", 3)
+    kwargs.setdefault("period", 1)
+    return RedisGCRALimiter(fakeredis.aioredis.FakeRedis(server=server), **kwargs)
+
+
+def test_local_allows_burst_then_denies():
+    limiter = GCRALimiter(rate=3, period=1)
+
+    assert [limiter.hit("user", now=0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.hit("user", now=0) == pytest.approx(1 / 3)
+    # Через интервал разрешается еще один запрос
+    assert limiter.hit("user", now=NS // 3) == 0
+    assert limiter.hit("other", now=0) == 0
+
+
+async def test_redis_allows_burst_then_denies(server):
+    limiter = make_limiter(server)
+
+    assert [await limiter.check(1) for _ in range(3)] == [0, 0, 0]
+    wait = await limiter.check(1)
+    assert 0 < wait <= 1 / 3
+    assert await limiter.check(2) == 0
+
+
+async def test_redis_limit_is_shared_between_instances(server):
+    first, second = make_limiter(server), make_limiter(server)
+
+    for _ in range(3):
+        assert await first.check(1) == 0
+    assert await second.check(1) > 0
+
+
+async def test_falls_back_to_local_limiter(server, warnings):
+    limiter = make_limiter(server)
+    server.connected = False
+
+    assert [await limiter.check(1) for _ in range(3)] == [0, 0, 0]
+    assert await limiter.check(1) > 0
+    assert limiter.is_degraded
+    # Об одном сбое пишем в лог один раз
+    assert len(warnings) == 1
+
+
+async def test_skips_redis_while_down(server, warnings, monkeypatch):
+    limiter = make_limiter(server)
+    server.connected = False
+    await limiter.check(1)
+
+    calls = []
+    monkeypatch.setattr(limiter, "_script", lambda **kwargs: calls.append(kwargs))
+    await limiter.check(1)
+    assert calls == []
+
+
+async def test_recovers_when_redis_is_back(server, warnings, monkeypatch):
+    monkeypatch.setattr(rate_limit_module, "REDIS_RETRY_AFTER", 0)
+    limiter = make_limiter(server)
+    server.connected = False
+    await limiter.check(1)
+    await limiter.check(1)
+    assert len(warnings) == 1
+
+    server.connected = True
+    assert await limiter.check(1) == 0
+    assert not limiter.is_degraded
+
+    # Новый сбой - новое предупреждение
+    server.connected = False
+    await limiter.check(1)
+    assert len(warnings) == 2
@@ -0,0 +1,111 @@
+from datetime import datetime
+
+from app.business.reminders import LEAD, OFF, ON, ReminderScheduler, find_transitions
+from utils.schedule_bits import DaySchedule
+from utils.schedule_store import SOURCE_TZ
+
+
+def midnight(year: int, month: int, day: int) -> int:
+    """Ключ дня в источнике - местная полночь"""
+    return int(SOURCE_TZ.localize(datetime(year, month, day)).timestamp())
+
+
+def local(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, SOURCE_TZ).strftime("%m-%d %H:%M")
+
+
+def schedule(*off_hours: int) -> DaySchedule:
+    """Расписание дня: света нет в часы {off_hours} (час 10 - это 10:00-11:00)"""
+    return DaySchedule.from_hours(
+        {str(hour + 1): "no" if hour in off_hours else "yes" for hour in range(24)}
+    )
+
+
+def collect(scheduler: ReminderScheduler, start: int, hours: int) -> list:
+    """Напоминания, которые таймер выдал бы за {hours} часов (проверка раз в минуту)"""
+    due = []
+    for now in range(start, start + hours * 3600, 60):
+        due.extend(scheduler.pop_due(now))
+    return due
+
+
+def transitions(day: int, today: DaySchedule, tomorrow: DaySchedule = None) -> list:
+    return [(local(at), kind) for at, kind in find_transitions(day, today, tomorrow)]
+
+
+def test_transitions_on_normal_day():
+    day = midnight(2026, 10, 17)
+
+    assert transitions(day, schedule(10)) == [("10-17 10:00", OFF), ("10-17 11:00", ON)]
+
+
+def test_transitions_on_dst_day():
+    # 25 октября 2026 в сутках 25 часов: 04:00 -> 03:00
+    day = midnight(2026, 10, 25)
+
+    assert transitions(day, schedule(10)) == [("10-25 10:00", OFF), ("10-25 11:00", ON)]
+
+
+def test_transitions_cross_midnight():
+    day = midnight(2026, 10, 25)
+
+    assert transitions(day, schedule(22, 23), schedule(0)) == [
+        ("10-25 22:00", OFF),
+        ("10-26 01:00", ON),
+    ]
+
+
+def test_rebuild_finds_tomorrow_after_dst_day():
+    today, tomorrow = midnight(2026, 10, 25), midnight(2026, 10, 26)
+    assert tomorrow - today == 25 * 3600
+    days = {today: {"GPV1.1": schedule()}, tomorrow: {"GPV1.1": schedule(8)}}
+    scheduler = ReminderScheduler()
+
+    scheduler.rebuild(days, today, now=today)
+    due = collect(scheduler, today, 49)
+
+    assert [(local(at), local(remind_at), kind) for remind_at, at, _, kind, _ in due] == [
+        ("10-26 08:00", "10-26 07:30", OFF),
+        ("10-26 09:00", "10-26 08:30", ON),
+    ]
+
+
+def test_pop_due_returns_reminders_in_time():
+    day = midnight(2026, 10, 17)
+    scheduler = ReminderScheduler()
+    scheduler.rebuild({day: {"GPV1.1": schedule(10)}}, day, now=day)
+    off_at = find_transitions(day, schedule(10), None)[0][0]
+
+    assert scheduler.pop_due(off_at - LEAD - 1) == []
+    due = scheduler.pop_due(off_at - LEAD)
+    assert [(at, group, kind) for _, at, group, kind, _ in due] == [(off_at, "GPV1.1", OFF)]
+    assert len(scheduler) == 1
+
+
+def test_rebuild_invalidates_previous_reminders():
+    day = midnight(2026, 10, 17)
+    scheduler = ReminderScheduler()
+    scheduler.rebuild({day: {"GPV1.1": schedule(10)}}, day, now=day)
+
+    # Отключение перенесли - старые напоминания устарели (новое поколение группы)
+    assert scheduler.rebuild({day: {"GPV1.1": schedule(14)}}, day, now=day) == 1
+    # Те же маски - пересчитывать нечего
+    assert scheduler.rebuild({day: {"GPV1.1": schedule(14)}}, day, now=day) == 0
+
+    due = collect(scheduler, day, 24)
+    assert [(local(at), kind) for _, at, _, kind, _ in due] == [
+        ("10-17 14:00", OFF),
+        ("10-17 15:00", ON),
+    ]
+    assert len(scheduler) == 0
+
+
+def test_group_removed_from_schedule_drops_reminders():
+    day = midnight(2026, 10, 17)
+    scheduler = ReminderScheduler()
+    scheduler.rebuild({day: {"GPV1.1": schedule(10), "GPV1.2": schedule(12)}}, day, now=day)
+
+    scheduler.rebuild({day: {"GPV1.2": schedule(12)}}, day, now=day)
+
+    due = collect(scheduler, day, 24)
+    assert {group for _, _, group, _, _ in due} == {"GPV1.2"}
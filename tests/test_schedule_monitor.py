@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+import app.business.github_schedule_monitor as monitor_module
+from app.business.github_schedule_monitor import STATE_NAME, GitHubScheduleMonitor
+from database.connect import async_session
+from database.services.schedule_state import ScheduleState
+from utils.schedule_store import ScheduleSnapshot
+
+DAY = 1_760_648_400
+
+
+def make_data(**hours) -> dict:
+    """Расписание на один день: {группа: статус всех часов}"""
+    groups = {
+        f"GPV{group.replace('_', '.')}": {str(hour): status for hour in range(1, 25)}
+        for group, status in hours.items()
+    }
+    return {"fact": {"today": DAY, "data": {str(DAY): groups}}}
+
+
+def make_snapshot(**hours) -> ScheduleSnapshot:
+    return ScheduleSnapshot(make_data(**hours))
+
+
+@pytest.fixture
+def monitors(db, tmp_path, monkeypatch):
+    """Два монитора, как на двух инстансах: запоминают, по каким группам ставили уведомления"""
+    monkeypatch.setattr(monitor_module, "PREVIOUS_SCHEDULE_FILE", tmp_path / "previous.json")
+    notified = []
+
+    async def add(session, groups, snapshot, baselines=None):
+        notified.append(set(groups))
+        return len(groups)
+
+    instances = []
+    for _ in range(2):
+        monitor = GitHubScheduleMonitor()
+        monitor.coalescer.add = add
+        instances.append(monitor)
+    return instances, notified
+
+
+async def test_new_leader_compares_with_shared_index(monitors):
+    (first, second), notified = monitors
+    v1 = make_snapshot(**{"1_1": "yes", "1_2": "yes"})
+    v2 = make_snapshot(**{"1_1": "no", "1_2": "yes"})
+
+    async with async_session() as session:
+        assert await first.check_and_notify(session, v1) == 0
+        assert await first.check_and_notify(session, v2) == 1
+        # Второй инстанс стал лидером: версия уже обработана, повторных уведомлений нет
+        assert await second.check_and_notify(session, v2) == 0
+
+    assert notified == [{"GPV1.1"}]
+
+
+async def test_legacy_file_is_used_until_index_is_in_db(monitors):
+    (monitor, _), notified = monitors
+    v1 = make_snapshot(**{"1_1": "yes"})
+    v2 = make_snapshot(**{"1_1": "no"})
+    monitor.previous_file.write_text(json.dumps(monitor._build_index(v1)), encoding="utf-8")
+
+    async with async_session() as session:
+        await monitor.check_and_notify(session, v2)
+        saved = json.loads(await ScheduleState.load(session, STATE_NAME))
+
+    assert notified == [{"GPV1.1"}]
+    assert saved["version"] == v2.version
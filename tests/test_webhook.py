@@ -0,0 +1,13 @@
+import pytest
+
+from main import check_webhook_secret
+
+
+@pytest.mark.parametrize("secret", [None, "", "with space", "x" * 257, "тайна"])
+def test_webhook_refuses_bad_secret(secret):
+    with pytest.raises(SystemExit):
+        check_webhook_secret(secret)
+
+
+def test_webhook_accepts_secret():
+    check_webhook_secret("Secret_token-123")
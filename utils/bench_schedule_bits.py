@@ -0,0 +1,161 @@
+"""
+Сравнение словарного представления расписания (fact.data источника) и битовых масок
+
+Запуск: python -m utils.bench_schedule_bits
+"""
+
+import hashlib
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from utils.schedule_bits import DaySchedule, build_days
+
+DAYS = 7
+GROUPS = 12
+REPEAT = 200
+
+STATUSES = ["yes", "no", "first", "second", "maybe", "mfirst", "msecond"]
+
+
+def make_fact_data(seed: int) -> dict:
+    random.seed(seed)
+    data = {}
+    for day in range(DAYS):
+        groups = {}
+        for group in range(GROUPS):
+            groups[f"GPV{group // 2 + 1}.{group % 2 + 1}"] = {
+                str(hour): random.choice(STATUSES) for hour in range(1, 25)
+            }
+        data[str(1760648400 + day * 86400)] = groups
+    return data
+
+
+def dict_periods(hours: dict) -> tuple[list, float, float, float]:
+    """Прежний алгоритм рендера: 48 сегментов, объединение периодов и подсчет часов"""
+    on = off = uncertain = 0.0
+    segments = []
+    for hour in range(1, 25):
+        status = hours.get(str(hour), "unknown")
+        if status == "yes":
+            segments += ["on", "on"]
+            on += 1
+        elif status == "no":
+            segments += ["off", "off"]
+            off += 1
+        elif status == "first":
+            segments += ["off", "on"]
+            on += 0.5
+            off += 0.5
+        elif status == "second":
+            segments += ["on", "off"]
+            on += 0.5
+            off += 0.5
+        elif status in ["maybe", "mfirst", "msecond"]:
+            segments += ["uncertain", "uncertain"]
+            uncertain += 1
+        else:
+            segments += ["uncertain", "uncertain"]
+
+    periods = []
+    start = 0
+    for i in range(1, len(segments)):
+        if segments[i] != segments[start]:
+            periods.append((segments[start], start, i))
+            start = i
+    periods.append((segments[start], start, len(segments)))
+    return periods, on, off, uncertain
+
+
+def dict_diff(old: dict, new: dict) -> set:
+    """Прежнее сравнение: хеш записи каждой группы"""
+
+    def fingerprint(hours):
+        raw = json.dumps(hours, sort_keys=True, separators=(",", ":"))
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+    changed = set()
+    for day in new:
+        for group in new[day].keys() | old.get(day, {}).keys():
+            if fingerprint(old.get(day, {}).get(group)) != fingerprint(new[day].get(group)):
+                changed.add((day, group))
+    return changed
+
+
+def bits_diff(old: dict, new: dict) -> set:
+    changed = set()
+    for day in new:
+        for group in new[day].keys() | old.get(day, {}).keys():
+            previous, current = old.get(day, {}).get(group), new[day].get(group)
+            if previous is None or current is None or current.diff(previous):
+                changed.add((day, group))
+    return changed
+
+
+def retained(build) -> int:
+    """Сколько памяти занимает результат build()"""
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def timed(run) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        run()
+    return (time.perf_counter() - started) / REPEAT
+
+
+def main() -> None:
+    raw_old = json.dumps(make_fact_data(1))
+    raw_new = json.dumps(make_fact_data(2))
+    dict_old, dict_new = json.loads(raw_old), json.loads(raw_new)
+    bits_old, bits_new = build_days(dict_old), build_days(dict_new)
+    first_day = dict_new[next(iter(dict_new))]
+    schedules = [(hours, DaySchedule.from_hours(hours)) for hours in first_day.values()]
+
+    # Результаты обоих путей должны совпадать
+    changed = bits_diff(bits_old, bits_new)
+    assert dict_diff(dict_old, dict_new) == {(str(day), group) for day, group in changed}
+    for hours, schedule in schedules:
+        periods, on, off, uncertain = dict_periods(hours)
+        assert periods == schedule.periods()
+        assert (on, off, uncertain) == (
+            schedule.hours_on,
+            schedule.hours_off,
+            schedule.hours_uncertain,
+        )
+
+    print(f"{DAYS} days x {GROUPS} groups ({sys.version.split()[0]})")
+
+    dict_memory = retained(lambda: json.loads(raw_new))
+    bits_memory = retained(lambda: build_days(json.loads(raw_new)))
+    print(f"memory   dict {dict_memory / 1024:8.1f} KiB   bits {bits_memory / 1024:8.1f} KiB")
+
+    hours_list = [hours for groups in dict_new.values() for hours in groups.values()]
+    dict_entry = retained(lambda: [dict(hours) for hours in hours_list]) / len(hours_list)
+    bits_entry = retained(
+        lambda: [DaySchedule.from_hours(hours) for hours in hours_list]
+    ) / len(hours_list)
+    print(f"entry    dict {dict_entry:8.0f} B     bits {bits_entry:8.0f} B")
+
+    dict_time = timed(lambda: dict_diff(dict_old, dict_new))
+    bits_time = timed(lambda: bits_diff(bits_old, bits_new))
+    print(f"diff     dict {dict_time * 1e6:8.1f} us    bits {bits_time * 1e6:8.1f} us")
+
+    dict_time = timed(lambda: [dict_periods(hours) for hours, _ in schedules])
+    bits_time = timed(
+        lambda: [
+            (s.periods(), s.hours_on, s.hours_off, s.hours_uncertain) for _, s in schedules
+        ]
+    )
+    print(f"render   dict {dict_time * 1e6:8.1f} us    bits {bits_time * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Сравнение старого списочного throttling и GCRA лимитера
+
+Запуск: python -m utils.bench_throttling
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from utils.rate_limit import GCRALimiter
+
+USERS = 10_000
+EVENTS = 200_000
+RATE = 3
+WINDOW = 1
+
+
+class ListThrottling:
+    """Алгоритм прежнего ThrottlingMiddleware (без asyncio.sleep)"""
+
+    def __init__(self):
+        self.time_window = timedelta(seconds=WINDOW)
+        self.user_requests = defaultdict(list)
+        self.last_cleanup = datetime.now()
+        self.cleanup_interval = timedelta(minutes=5)
+
+    def hit(self, user_id: int, now: datetime) -> bool:
+        if now - self.last_cleanup >= self.cleanup_interval:
+            for requests in list(self.user_requests.values()):
+                requests[:] = [t for t in requests if now - t < self.time_window]
+            self.user_requests = defaultdict(
+                list, {k: v for k, v in self.user_requests.items() if v}
+            )
+            self.last_cleanup = now
+
+        requests = self.user_requests[user_id]
+        requests[:] = [t for t in requests if now - t < self.time_window]
+        allowed = len(requests) < RATE
+        requests.append(now)
+        return allowed
+
+
+def make_events() -> list[tuple[int, float]]:
+    random.seed(42)
+    # 1 % пользователей (спамеры) дают 80 % запросов, события равномерно на 60 секундах
+    hot = USERS // 100
+    events = []
+    for i in range(EVENTS):
+        user = random.randrange(hot) if random.random() < 0.8 else random.randrange(USERS)
+        events.append((user, i * 60 / EVENTS))
+    return events
+
+
+def bench(name: str, run) -> None:
+    started = time.perf_counter()
+    allowed = run()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<8} {elapsed * 1e9 / EVENTS:8.0f} ns/event   "
+        f"peak {peak / 1024:8.0f} KiB   allowed {allowed}"
+    )
+
+
+def main() -> None:
+    events = make_events()
+    base = datetime.now()
+
+    def run_list():
+        throttling = ListThrottling()
+        return sum(throttling.hit(u, base + timedelta(seconds=t)) for u, t in events)
+
+    def run_gcra():
+        limiter = GCRALimiter(rate=RATE, period=WINDOW)
+        return sum(not limiter.hit(u, int(t * 1e9)) for u, t in events)
+
+    print(f"{EVENTS} events, {USERS} users, limit {RATE}/{WINDOW}s ({sys.version.split()[0]})")
+    bench("list", run_list)
+    bench("gcra", run_gcra)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Заглушка Telegram для локальной проверки webhook режима
+
+Поднимает фейковый Bot API (отвечает на любые методы) и отправляет в webhook бота
+сгенерированные апдейты, как это делает Telegram.
+
+Бот:      RUN_MODE=webhook WEBHOOK_SECRET=secret TELEGRAM_API_URL=http://127.0.0.1:8081 python main.py
+Заглушка: python -m utils.fake_telegram --webhook http://127.0.0.1:8080/webhook --secret secret
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+from aiohttp import ClientSession, web
+
+message_ids = itertools.count(1)
+calls: dict[str, int] = {}
+
+
+async def api_handler(request: web.Request) -> web.Response:
+    """Отвечает на вызовы Bot API так, чтобы aiogram смог разобрать ответ"""
+    method = request.match_info["method"]
+    calls[method] = calls.get(method, 0) + 1
+
+    if request.content_type == "application/json":
+        params = await request.json()
+    else:
+        params = dict(await request.post())
+
+    if method == "getMe":
+        result = {"id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_bot"}
+    elif method in ("sendMessage", "editMessageText"):
+        result = {
+            "message_id": int(params.get("message_id") or next(message_ids)),
+            "date": int(time.time()),
+            "chat": {"id": int(params["chat_id"]), "type": "private"},
+            "text": params.get("text", ""),
+        }
+    else:
+        result = True
+
+    return web.json_response({"ok": True, "result": result})
+
+
+def make_update(update_id: int, user_id: int, text: str) -> dict:
+    user = {"id": user_id, "is_bot": False, "first_name": f"User {user_id}", "language_code": "uk"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private", "first_name": user["first_name"]},
+            "from": user,
+            "text": text,
+        },
+    }
+
+
+async def post_updates(url: str, secret: str, count: int, users: int, text: str) -> None:
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret else {}
+    latencies = []
+
+    async with ClientSession() as session:
+        for update_id in range(1, count + 1):
+            update = make_update(update_id, 100_000 + update_id % users, text)
+            started = time.perf_counter()
+            async with session.post(url, data=json.dumps(update), headers=headers) as response:
+                latencies.append(time.perf_counter() - started)
+                if response.status != 200:
+                    print(f"update {update_id}: HTTP {response.status}")
+
+    latencies.sort()
+    print(
+        f"Отправлено {count} апдейтов: p50 {latencies[len(latencies) // 2] * 1000:.1f} мс, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} мс"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--webhook", default="http://127.0.0.1:8080/webhook")
+    parser.add_argument("--secret", default="")
+    parser.add_argument("--api-port", type=int, default=8081)
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--text", default="🗓 Розклад")
+    parser.add_argument("--delay", type=float, default=0, help="пауза перед отправкой апдейтов")
+    args = parser.parse_args()
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", api_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.api_port).start()
+
+    await asyncio.sleep(args.delay)
+    await post_updates(args.webhook, args.secret, args.updates, args.users, args.text)
+
+    # Даем боту обработать апдейты в фоне
+    await asyncio.sleep(2)
+    print(f"Вызовы Bot API: {calls}")
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""
+Асинхронная загрузка расписания с GitHub
+Использует общую HTTP-сессию и условные запросы (If-None-Match / If-Modified-Since),
+поэтому не блокирует цикл событий бота и не перекачивает неизмененный файл
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+import aiohttp
+
+from utils.github_schedule import GITHUB_JSON_URL, SCHEDULE_FILE
+from utils.logging import logger
+from utils.schedule_store import schedule_store
+
+
+class GitHubScheduleFetcher:
+    """Загрузчик расписания с поддержкой ETag / Last-Modified"""
+
+    def __init__(
+        self,
+        url: str = GITHUB_JSON_URL,
+        schedule_file: Path = SCHEDULE_FILE,
+        timeout: float = 10,
+        retries: int = 3,
+        backoff: float = 2,
+    ):
+        """
+        Args:
+            url: Адрес JSON файла с расписанием
+            schedule_file: Локальная копия расписания
+            timeout: Общий таймаут одного запроса в секундах
+            retries: Количество попыток при сетевых ошибках и ответах 5xx
+            backoff: Базовая задержка между попытками (растет экспоненциально)
+        """
+        self.url = url
+        self.schedule_file = schedule_file
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Возвращает общую HTTP-сессию (создается при первом запросе)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+            )
+        return self._session
+
+    def _conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    async def fetch(self) -> Optional[Dict]:
+        """
+        Загружает расписание, если оно изменилось с прошлого запроса
+
+        Returns:
+            Новые данные расписания или None (не изменилось / ошибка)
+        """
+        session = self._get_session()
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with session.get(self.url, headers=self._conditional_headers()) as response:
+                    if response.status == 304:
+                        logger.log("GITHUB", "Расписание на GitHub не изменилось (304)")
+                        return None
+
+                    if response.status >= 500:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info,
+                            response.history,
+                            status=response.status,
+                            message=response.reason or "",
+                        )
+
+                    response.raise_for_status()
+                    body = await response.read()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+
+                data = await asyncio.to_thread(json.loads, body)
+                await asyncio.to_thread(self._save, data)
+
+                self.etag = etag
+                self.last_modified = last_modified
+                schedule_store.replace(data)
+
+                logger.log("GITHUB", "✅ Расписание успешно загружено и сохранено")
+                return data
+
+            except aiohttp.ClientResponseError as e:
+                if e.status < 500:
+                    logger.error(f"Ошибка при загрузке данных с GitHub: {e}")
+                    return None
+                logger.warning(f"GitHub ответил {e.status} (попытка {attempt}/{self.retries})")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(
+                    f"Ошибка сети при загрузке с GitHub (попытка {attempt}/{self.retries}): {e!r}"
+                )
+            except Exception as e:
+                logger.error(f"Неожиданная ошибка при загрузке расписания: {e}")
+                return None
+
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+
+        logger.error("Не удалось загрузить расписание с GitHub после всех попыток")
+        return None
+
+    def _save(self, data: Dict) -> None:
+        """Сохраняет расписание в локальный файл"""
+        with open(self.schedule_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    async def close(self) -> None:
+        """Закрывает HTTP-сессию"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+# Общий загрузчик для фоновых задач
+github_fetcher = GitHubScheduleFetcher()
@@ -6,12 +6,13 @@
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
-
-import requests
+from typing import Dict, List, Mapping, Optional
 
 from data.config import DIR
 from utils.logging import logger
+from utils.schedule_analytics import schedule_history
+from utils.schedule_bits import DaySchedule
+from utils.schedule_store import ScheduleSnapshot, schedule_store
 
 # URL для загрузки данных с GitHub
 GITHUB_JSON_URL = (
@@ -57,34 +58,8 @@ SEPARATOR_THIN = "─" * 10
 SEPARATOR_THICK = "━" * 10
 SEPARATOR_DOTS = "· · · · · · · · ·"
 
-
-def download_schedule_from_github() -> Optional[Dict]:
-    """
-    Загружает расписание с GitHub
-
-    Returns:
-        Словарь с данными расписания или None при ошибке
-    """
-    try:
-        logger.log("GITHUB", f"Загрузка расписания с GitHub: {GITHUB_JSON_URL}")
-        response = requests.get(GITHUB_JSON_URL, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
-
-        # Сохраняем локально
-        with open(SCHEDULE_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-        logger.log("GITHUB", "✅ Расписание успешно загружено и сохранено")
-        return data
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Ошибка при загрузке данных с GitHub: {e}")
-        return None
-    except Exception as e:
-        logger.error(f"Неожиданная ошибка при загрузке расписания: {e}")
-        return None
+# Готовые тексты расписания: (группа, день, версия снимка) -> текст
+_render_cache: Dict[tuple, str] = {}
 
 
 def load_local_schedule() -> Optional[Dict]:
@@ -109,20 +84,36 @@ def load_local_schedule() -> Optional[Dict]:
         return None
 
 
-def get_schedule() -> Optional[Dict]:
+# Первое обращение к хранилищу читает локальный файл
+schedule_store.set_loader(load_local_schedule)
+
+
+def get_schedule_snapshot() -> Optional[ScheduleSnapshot]:
     """
-    Получает расписание (сначала пытается загрузить из локального файла)
+    Получает текущий снимок расписания из памяти
+    (при первом обращении читает локальный файл; загрузку с GitHub
+    выполняет фоновая задача, чтобы не блокировать обработчики)
 
     Returns:
-        Словарь с данными расписания
+        Снимок расписания или None
     """
-    data = load_local_schedule()
+    snapshot = schedule_store.get()
+
+    if snapshot is None:
+        logger.log("GITHUB", "Расписание еще не загружено, ожидаю фоновую загрузку с GitHub")
+
+    return snapshot
 
-    if not data:
-        logger.log("GITHUB", "Локальное расписание не найдено, загружаю с GitHub")
-        data = download_schedule_from_github()
 
-    return data
+def get_schedule() -> Optional[Mapping]:
+    """
+    Получает расписание (из снимка в памяти)
+
+    Returns:
+        Словарь с данными расписания (только для чтения)
+    """
+    snapshot = get_schedule_snapshot()
+    return snapshot.data if snapshot else None
 
 
 def parse_group_number(group_input: str) -> Optional[str]:
@@ -160,7 +151,9 @@ def parse_group_number(group_input: str) -> Optional[str]:
     return None
 
 
-def get_group_schedule_for_day(group_key: str, timestamp: Optional[int] = None) -> Optional[Dict]:
+def get_group_schedule_for_day(
+    group_key: str, timestamp: Optional[int] = None
+) -> Optional[DaySchedule]:
     """
     Получает расписание для группы на конкретный день
 
@@ -169,36 +162,25 @@ def get_group_schedule_for_day(group_key: str, timestamp: Optional[int] = None)
         timestamp: Unix timestamp дня (если None, берется сегодня)
 
     Returns:
-        Словарь с расписанием по часам или None если не найдено
+        Битовые маски получасов (DaySchedule) или None если не найдено
     """
-    data = get_schedule()
+    snapshot = get_schedule_snapshot()
 
-    if not data:
+    if not snapshot:
         return None
 
-    # Получаем данные фактического расписания
-    fact_data = data.get("fact", {}).get("data", {})
-
     # Если timestamp не указан, берем сегодняшний день
-    if timestamp is None:
-        timestamp = data.get("fact", {}).get("today")
-
-    if not timestamp:
+    if timestamp is None and not snapshot.today:
         logger.error("Не удалось определить текущий день")
         return None
 
-    # Получаем расписание для дня
-    day_schedule = fact_data.get(str(timestamp), {})
-
-    # Получаем расписание для группы
-    group_schedule = day_schedule.get(group_key)
-
-    return group_schedule
+    return snapshot.get_group_day(group_key, timestamp)
 
 
 def format_schedule_text(group_input: str, timestamp: Optional[int] = None) -> str:
     """
     Форматирует расписание группы в текстовый вид
+    (готовый текст берется из кеша, рендер выполняется только при промахе)
 
     Args:
         group_input: Ввод группы (например "3.1")
@@ -213,22 +195,66 @@ def format_schedule_text(group_input: str, timestamp: Optional[int] = None) -> s
     if not group_key:
         return f"❌ Не удалось определить группу из ввода: {group_input}\n\nПример: 3.1 или GPV3.1"
 
-    # Получаем расписание
-    schedule = get_group_schedule_for_day(group_key, timestamp)
+    # Получаем расписание (один снимок на весь запрос)
+    snapshot = get_schedule_snapshot()
 
-    if not schedule:
+    if not snapshot:
         return f"❌ Расписание для группы {group_key} не найдено"
 
-    # Получаем данные для форматирования
-    data = get_schedule()
-    preset = data.get("preset", {})
+    if timestamp is None:
+        timestamp = snapshot.today
 
-    # Получаем название группы
-    group_names = preset.get("sch_names", {})
-    group_name = group_names.get(group_key, group_key)
+    cache_key = (group_key, timestamp, snapshot.version)
+    if (text := _render_cache.get(cache_key)) is not None:
+        return text
+
+    text = _render_schedule_text(snapshot, group_key, timestamp)
+    if text is None:
+        return f"❌ Расписание для группы {group_key} не найдено"
+
+    _render_cache[cache_key] = text
+    return text
+
+
+def warm_render_cache(snapshot: ScheduleSnapshot) -> None:
+    """
+    Сбрасывает кеш текстов и заново рендерит расписание всех групп на все дни снимка
+
+    Args:
+        snapshot: Новый снимок расписания
+    """
+    _render_cache.clear()
+
+    for day in snapshot.days:
+        for group_key in snapshot.group_names:
+            text = _render_schedule_text(snapshot, group_key, day)
+            if text is not None:
+                _render_cache[(group_key, day, snapshot.version)] = text
+
+    logger.log("GITHUB", f"Кеш текстов расписания заполнен: {len(_render_cache)} записей")
 
-    # Получаем описания статусов
-    time_types = preset.get("time_type", {})
+
+def _render_schedule_text(
+    snapshot: ScheduleSnapshot, group_key: str, timestamp: Optional[int]
+) -> Optional[str]:
+    """
+    Рендерит расписание группы на день из снимка
+
+    Args:
+        snapshot: Снимок расписания
+        group_key: Ключ группы (например "GPV3.1")
+        timestamp: Unix timestamp дня
+
+    Returns:
+        Форматированная строка или None если расписания нет
+    """
+    schedule = snapshot.get_group_day(group_key, timestamp)
+
+    if schedule is None:
+        return None
+
+    # Получаем название группы
+    group_name = snapshot.group_names.get(group_key, group_key)
 
     # ═══════════════════════════════════════════════════════════
     # ФОРМИРУЕМ ЗАГОЛОВОК
@@ -239,88 +265,22 @@ def format_schedule_text(group_input: str, timestamp: Optional[int] = None) -> s
     # ФОРМИРУЕМ КОМПАКТНОЕ РАСПИСАНИЕ (ОБЪЕДИНЯЕМ ПЕРИОДЫ)
     # ═══════════════════════════════════════════════════════════
 
-    # Подсчет часов
-    total_hours_on = 0.0
-    total_hours_off = 0.0
-    total_hours_uncertain = 0.0
-
-    # Создаем массив получасовых сегментов (48 сегментов в сутках)
-    # Каждый сегмент: (час, минута, статус)
-    # Статусы: "on", "off", "uncertain"
-    half_hour_segments = []
-
-    for hour in range(1, 25):
-        status = schedule.get(str(hour), "unknown")
-
-        if status == "yes":
-            # Оба получаса включены
-            half_hour_segments.append(("on", hour - 1, 0))
-            half_hour_segments.append(("on", hour - 1, 30))
-            total_hours_on += 1.0
-        elif status == "no":
-            # Оба получаса выключены
-            half_hour_segments.append(("off", hour - 1, 0))
-            half_hour_segments.append(("off", hour - 1, 30))
-            total_hours_off += 1.0
-        elif status == "first":
-            # Первые 30 мин выключено, вторые 30 мин включено
-            half_hour_segments.append(("off", hour - 1, 0))
-            half_hour_segments.append(("on", hour - 1, 30))
-            total_hours_off += 0.5
-            total_hours_on += 0.5
-        elif status == "second":
-            # Первые 30 мин включено, вторые 30 мин выключено
-            half_hour_segments.append(("on", hour - 1, 0))
-            half_hour_segments.append(("off", hour - 1, 30))
-            total_hours_on += 0.5
-            total_hours_off += 0.5
-        elif status in ["maybe", "mfirst", "msecond"]:
-            # Неопределенный статус
-            half_hour_segments.append(("uncertain", hour - 1, 0))
-            half_hour_segments.append(("uncertain", hour - 1, 30))
-            total_hours_uncertain += 1.0
-        else:
-            # Неизвестный статус
-            half_hour_segments.append(("uncertain", hour - 1, 0))
-            half_hour_segments.append(("uncertain", hour - 1, 30))
-
-    # Группируем последовательные сегменты с одинаковым статусом
-    periods = []
-    if half_hour_segments:
-        current_status = half_hour_segments[0][0]
-        start_hour = half_hour_segments[0][1]
-        start_min = half_hour_segments[0][2]
-
-        for i in range(1, len(half_hour_segments)):
-            segment_status, hour, minute = half_hour_segments[i]
-
-            if segment_status != current_status:
-                # Завершаем текущий период
-                periods.append(
-                    {
-                        "status": current_status,
-                        "start_hour": start_hour,
-                        "start_min": start_min,
-                        "end_hour": hour,
-                        "end_min": minute,
-                    }
-                )
-
-                # Начинаем новый период
-                current_status = segment_status
-                start_hour = hour
-                start_min = minute
-
-        # Добавляем последний период (до 24:00)
-        periods.append(
-            {
-                "status": current_status,
-                "start_hour": start_hour,
-                "start_min": start_min,
-                "end_hour": 24,
-                "end_min": 0,
-            }
-        )
+    # Часы по статусам и периоды считаются по битовым маскам получасов
+    total_hours_on = schedule.hours_on
+    total_hours_off = schedule.hours_off
+    total_hours_uncertain = schedule.hours_uncertain
+
+    # Последовательные получасы с одинаковым статусом объединены в периоды
+    periods = [
+        {
+            "status": status,
+            "start_hour": start // 2,
+            "start_min": start % 2 * 30,
+            "end_hour": end // 2,
+            "end_min": end % 2 * 30,
+        }
+        for status, start, end in schedule.periods()
+    ]
 
     # Выводим периоды
     for period in periods:
@@ -425,15 +385,12 @@ def get_all_available_groups() -> List[str]:
     Returns:
         Список ключей групп
     """
-    data = get_schedule()
+    snapshot = get_schedule_snapshot()
 
-    if not data:
+    if not snapshot:
         return []
 
-    preset = data.get("preset", {})
-    group_names = preset.get("sch_names", {})
-
-    return list(group_names.keys())
+    return list(snapshot.group_names.keys())
 
 
 def get_group_display_name(group_key: str) -> str:
@@ -446,12 +403,65 @@ def get_group_display_name(group_key: str) -> str:
     Returns:
         Название группы для отображения
     """
-    data = get_schedule()
+    snapshot = get_schedule_snapshot()
 
-    if not data:
+    if not snapshot:
         return group_key
 
-    preset = data.get("preset", {})
-    group_names = preset.get("sch_names", {})
+    return snapshot.group_names.get(group_key, group_key)
+
+
+def _format_hours(hours: float) -> str:
+    """Целые часы без дробной части, остальные с одним знаком"""
+    return f"{int(hours)}" if hours == int(hours) else f"{hours:.1f}"
+
+
+WEEKDAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд")
+
+
+def format_week_text(group_input: str, days: int = 7) -> str:
+    """
+    Форматирует статистику отключений группы за последние дни
+
+    Args:
+        group_input: Ввод группы (например "3.1")
+        days: Длина периода в днях
+
+    Returns:
+        Форматированная строка со статистикой
+    """
+    group_key = parse_group_number(group_input)
+    report = schedule_history.report(days) if group_key else None
+    stats = report.get(group_key) if report else None
+
+    if not stats:
+        return f"❌ Статистика для групи {group_input} поки недоступна"
+
+    text = (
+        f"{EMOJI_BULB} <b>{get_group_display_name(group_key)}</b>\n"
+        f"{EMOJI_CALENDAR} {report.start:%d.%m} - {report.end:%d.%m}\n\n"
+    )
+
+    for day, hours_off in report.daily(group_key):
+        text += f"{WEEKDAYS[day.weekday()]} {day:%d.%m}: {_format_hours(hours_off)} год.\n"
+
+    text += f"\n{SEPARATOR_THIN}\n"
+    text += f"{EMOJI_LIGHT_OFF} Світла не було: <b>{_format_hours(stats.hours_off)}</b> год.\n"
+    if stats.hours_uncertain:
+        text += (
+            f"{EMOJI_MAYBE_OFF} Можливі відключення: "
+            f"<b>{_format_hours(stats.hours_uncertain)}</b> год.\n"
+        )
+    if stats.longest_start:
+        text += (
+            f"{EMOJI_CLOCK} Найдовше відключення: "
+            f"<b>{_format_hours(stats.longest_hours)}</b> год. "
+            f"({stats.longest_start:%d.%m %H:%M})\n"
+        )
+    text += f"📈 Місце серед груп: <b>{stats.rank}</b> з {len(report.groups)}\n"
+
+    return text
+
 
-    return group_names.get(group_key, group_key)
+# Кеш текстов пересобирается при каждом новом снимке
+schedule_store.subscribe(warm_render_cache)
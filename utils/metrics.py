@@ -0,0 +1,115 @@
+"""
+Простые метрики процесса (без внешних зависимостей)
+Значения хранятся в памяти и выводятся администратору командой /metrics
+"""
+
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional
+
+
+class LatencyStats:
+    """Статистика задержек по последним N наблюдениям"""
+
+    def __init__(self, size: int = 200):
+        self.values: deque[float] = deque(maxlen=size)
+        self.count = 0
+        self.last: Optional[float] = None
+
+    def observe(self, seconds: float) -> None:
+        self.values.append(seconds)
+        self.count += 1
+        self.last = seconds
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.values:
+            return None
+        ordered = sorted(self.values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "last": self.last,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": max(self.values) if self.values else None,
+        }
+
+
+class MetricsRegistry:
+    """Именованные счетчики, текущие значения и задержки"""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.latencies: Dict[str, LatencyStats] = {}
+        # Значения, которые считываются в момент вывода (например, длина очереди)
+        self.gauges: Dict[str, Callable[[], float]] = {}
+        self.started = time.monotonic()
+
+    def inc(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        self.gauges[name] = read
+
+    def latency(self, name: str) -> LatencyStats:
+        if name not in self.latencies:
+            self.latencies[name] = LatencyStats()
+        return self.latencies[name]
+
+    def format(self) -> str:
+        """Текстовое представление всех метрик"""
+        lines = [f"uptime: {time.monotonic() - self.started:.0f}s"]
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name}: {value}")
+        for name, read in sorted(self.gauges.items()):
+            lines.append(f"{name}: {read()}")
+        for name, stats in sorted(self.latencies.items()):
+            summary = stats.summary()
+            values = ", ".join(
+                f"{key}={value:.3g}s" if isinstance(value, float) else f"{key}={value}"
+                for key, value in summary.items()
+                if value is not None
+            )
+            lines.append(f"{name}: {values}")
+        return "\n".join(lines)
+
+
+class DeliveryTracker:
+    """
+    Задержка от изменения расписания до первого доставленного уведомления.
+    Версия регистрируется при постановке уведомлений в очередь и снимается
+    с учета, когда воркер доставил первое сообщение этой версии.
+    """
+
+    def __init__(self, registry: MetricsRegistry, maxsize: int = 32):
+        self.registry = registry
+        self.maxsize = maxsize
+        # version -> (время изменения в источнике, время обнаружения)
+        self._pending: OrderedDict[str, tuple[Optional[datetime], datetime]] = OrderedDict()
+
+    def track(self, version: str, changed_at: Optional[datetime] = None) -> None:
+        self._pending[version] = (changed_at, datetime.now(timezone.utc))
+        while len(self._pending) > self.maxsize:
+            self._pending.popitem(last=False)
+
+    def delivered(self, versions: Iterable[str]) -> None:
+        now = datetime.now(timezone.utc)
+        for version in set(versions):
+            if (item := self._pending.pop(version, None)) is None:
+                continue
+            changed_at, detected_at = item
+            self.registry.latency("schedule_detect_to_notify").observe(
+                (now - detected_at).total_seconds()
+            )
+            if changed_at is not None:
+                self.registry.latency("schedule_change_to_notify").observe(
+                    max(0.0, (now - changed_at).total_seconds())
+                )
+
+
+metrics = MetricsRegistry()
+delivery_tracker = DeliveryTracker(metrics)
@@ -0,0 +1,142 @@
+"""
+Приоритетная очередь исходящих запросов к Bot API
+Все запросы бота проходят через общий лимит (token bucket). Когда токенов не хватает,
+первыми их получают запросы с высоким приоритетом (ответы на апдейты пользователей),
+массовые рассылки ждут. Приоритет задается contextvar: по умолчанию высокий,
+рассылки оборачиваются в low_priority().
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, Optional
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import GetUpdates, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from utils.metrics import metrics
+
+HIGH = 0
+LOW = 1
+PRIORITY_NAMES = {HIGH: "high", LOW: "low"}
+
+# Общий лимит запросов бота в секунду
+RATE: float = 30
+
+request_priority: ContextVar[int] = ContextVar("request_priority", default=HIGH)
+
+
+@contextmanager
+def low_priority() -> Iterator[None]:
+    """Запросы внутри блока (и в созданных в нем задачах) получают низкий приоритет"""
+    token = request_priority.set(LOW)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class PriorityLimiter:
+    """Token bucket с двумя очередями ожидания: высокий приоритет обслуживается первым"""
+
+    def __init__(self, rate: float = RATE, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._queues: Dict[int, Deque[asyncio.Future]] = {HIGH: deque(), LOW: deque()}
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def pending(self, priority: int) -> int:
+        """Количество запросов в очереди"""
+        return sum(not future.done() for future in self._queues[priority])
+
+    def pause(self, seconds: float) -> None:
+        """Останавливает выдачу токенов (после TelegramRetryAfter)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._updated = self._paused_until
+        self._tokens = 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: int = HIGH) -> None:
+        """Ждет токен в очереди своего приоритета"""
+        started = time.monotonic()
+        name = PRIORITY_NAMES[priority]
+        metrics.inc(f"api_requests_{name}")
+
+        if not any(self._queues.values()) and started >= self._paused_until:
+            self._refill(started)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                metrics.latency(f"api_wait_{name}").observe(0.0)
+                return
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(future)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        # Отмененный запрос остается в очереди и пропускается диспетчером
+        await future
+        metrics.latency(f"api_wait_{name}").observe(time.monotonic() - started)
+
+    async def _dispatch(self) -> None:
+        """Выдает токены ожидающим по мере пополнения"""
+        while True:
+            if self._next() is None:
+                return
+
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._refill(now)
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+
+            # За время ожидания мог прийти запрос с высоким приоритетом
+            if (queue := self._next()) is not None:
+                self._tokens -= 1
+                queue.popleft().set_result(None)
+
+    def _next(self) -> Optional[Deque[asyncio.Future]]:
+        """Очередь с наивысшим приоритетом, в начале которой ждет неотмененный запрос"""
+        for queue in self._queues.values():
+            while queue and queue[0].done():
+                queue.popleft()
+            if queue:
+                return queue
+        return None
+
+
+class PrioritySession(AiohttpSession):
+    """Сессия бота, пропускающая запросы через общий приоритетный лимит"""
+
+    def __init__(self, limiter: Optional[PriorityLimiter] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter or PriorityLimiter()
+        for priority, name in PRIORITY_NAMES.items():
+            metrics.gauge(f"api_queue_{name}", lambda p=priority: self.limiter.pending(p))
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None
+    ) -> TelegramType:
+        # Long polling не расходует лимит отправки
+        if not isinstance(method, GetUpdates):
+            await self.limiter.acquire(request_priority.get())
+        try:
+            return await super().make_request(bot, method, timeout)
+        except TelegramRetryAfter as e:
+            # Flood control распространяется на весь бот - останавливаем обе очереди
+            self.limiter.pause(e.retry_after)
+            raise
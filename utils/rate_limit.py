@@ -0,0 +1,152 @@
+"""
+Ограничение частоты запросов по алгоритму GCRA (generic cell rate algorithm)
+На каждый ключ хранится одно целое число - теоретическое время прихода (TAT) в наносекундах
+"""
+
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from utils.logging import logger
+
+NS = 1_000_000_000
+US = 1_000_000
+
+# Сколько секунд не обращаться к Redis после ошибки (запросы идут в локальный лимитер)
+REDIS_RETRY_AFTER: float = 5
+
+# Атомарный GCRA в Redis: время берется из TIME самого Redis, чтобы часы инстансов не влияли
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - tolerance
+if now < allow_at then
+    return allow_at - now
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil((new_tat - now) / 1000))
+return 0
+"""
+
+
+class GCRALimiter:
+    """
+    In-memory GCRA лимитер.
+    Ключи упорядочены по времени последнего обращения, поэтому неактивные
+    вытесняются с головы словаря за O(1) на каждый запрос.
+    """
+
+    def __init__(self, rate: int, period: float, burst: Optional[int] = None):
+        """
+        Args:
+            rate: Количество разрешенных запросов за период
+            period: Период в секундах
+            burst: Сколько запросов можно сделать подряд (по умолчанию rate)
+        """
+        self.interval = int(period * NS) // rate
+        self.tolerance = self.interval * (burst or rate)
+        self._tat: OrderedDict[Hashable, int] = OrderedDict()
+
+    def hit(self, key: Hashable, now: Optional[int] = None) -> float:
+        """
+        Регистрирует запрос
+
+        Returns:
+            0 если запрос разрешен, иначе сколько секунд ждать до следующего разрешенного
+        """
+        if now is None:
+            now = time.monotonic_ns()
+
+        self._evict(now)
+
+        tat = max(self._tat.get(key, now), now)
+        new_tat = tat + self.interval
+        allow_at = new_tat - self.tolerance
+
+        if now < allow_at:
+            return (allow_at - now) / NS
+
+        self._tat[key] = new_tat
+        self._tat.move_to_end(key)
+        return 0
+
+    async def check(self, key: Hashable) -> float:
+        """Асинхронный вариант hit() - общий интерфейс с RedisGCRALimiter"""
+        return self.hit(key)
+
+    def _evict(self, now: int, limit: int = 2) -> None:
+        """Удаляет ключи, чье состояние уже не отличается от нового пользователя"""
+        for _ in range(limit):
+            if not self._tat:
+                return
+            key, tat = next(iter(self._tat.items()))
+            if tat > now:
+                return
+            del self._tat[key]
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+class RedisGCRALimiter:
+    """
+    GCRA лимитер в Redis, общий для всех инстансов бота.
+    При недоступности Redis переключается на in-memory лимитер и повторяет
+    попытку не чаще раза в REDIS_RETRY_AFTER секунд (о сбое пишет в лог один раз).
+    """
+
+    def __init__(
+        self, redis, rate: int, period: float, burst: Optional[int] = None, prefix: str = "throttle"
+    ):
+        """
+        Args:
+            redis: Асинхронный клиент Redis
+            rate: Количество разрешенных запросов за период
+            period: Период в секундах
+            burst: Сколько запросов можно сделать подряд (по умолчанию rate)
+            prefix: Префикс ключей в Redis
+        """
+        self.redis = redis
+        self.prefix = prefix
+        self.interval = int(period * US) // rate
+        self.tolerance = self.interval * (burst or rate)
+        self.fallback = GCRALimiter(rate=rate, period=period, burst=burst)
+        self._script = redis.register_script(GCRA_SCRIPT)
+        # До какого момента (monotonic) Redis считается недоступным
+        self._down_until: Optional[float] = None
+
+    async def check(self, key: Hashable) -> float:
+        """
+        Регистрирует запрос
+
+        Returns:
+            0 если запрос разрешен, иначе сколько секунд ждать до следующего разрешенного
+        """
+        if self._down_until is not None and time.monotonic() < self._down_until:
+            return self.fallback.hit(key)
+
+        try:
+            wait = await self._script(
+                keys=[f"{self.prefix}:{key}"], args=[self.interval, self.tolerance]
+            )
+        except Exception as e:
+            if self._down_until is None:
+                logger.warning(f"Redis лимитер недоступен, используется локальный: {e}")
+            self._down_until = time.monotonic() + REDIS_RETRY_AFTER
+            return self.fallback.hit(key)
+
+        if self._down_until is not None:
+            self._down_until = None
+            logger.log("BOT", "Redis лимитер снова доступен")
+        return int(wait) / US
+
+    @property
+    def is_degraded(self) -> bool:
+        """Лимитер работает на локальном состоянии из-за ошибки Redis"""
+        return self._down_until is not None
@@ -0,0 +1,260 @@
+"""
+Аналитика отключений за несколько дней по всем группам
+Сохраненные дни собираются в массив NumPy формы (дни x группы x 48 получасов),
+часы без света, самое долгое отключение и рейтинг групп считаются за один проход.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from utils.schedule_bits import SLOTS, DaySchedule
+from utils.schedule_store import SOURCE_TZ, ScheduleSnapshot, schedule_store
+
+DAY = 86400
+# Сколько дней истории держать в памяти
+MAX_DAYS: int = 400
+
+_SLOT_SHIFTS = np.arange(SLOTS, dtype=np.uint64)
+
+
+class ScheduleMatrix:
+    """Битовые маски истории, развернутые в массивы по получасам"""
+
+    __slots__ = ("timestamps", "groups", "off", "maybe", "present")
+
+    def __init__(self, days: Mapping[int, Mapping[str, DaySchedule]]):
+        first, last = min(days), max(days)
+        # Дни подряд, пропуски заполняются нулями (present = False)
+        count = round((last - first) / DAY) + 1
+        self.timestamps = np.full(count, -1, dtype=np.int64)
+        self.groups = sorted({group for groups in days.values() for group in groups})
+        group_index = {group: i for i, group in enumerate(self.groups)}
+
+        off = np.zeros((count, len(self.groups)), dtype=np.uint64)
+        maybe = np.zeros_like(off)
+        self.present = np.zeros(off.shape, dtype=bool)
+
+        for timestamp, groups in days.items():
+            day = round((timestamp - first) / DAY)
+            self.timestamps[day] = timestamp
+            for group, schedule in groups.items():
+                g = group_index[group]
+                off[day, g] = schedule.off_mask
+                maybe[day, g] = schedule.maybe_mask
+                self.present[day, g] = True
+
+        # (дни, группы, 48) - один bool на получас
+        self.off = ((off[:, :, None] >> _SLOT_SHIFTS) & 1).astype(bool)
+        self.maybe = ((maybe[:, :, None] >> _SLOT_SHIFTS) & 1).astype(bool)
+
+    def day_range(self, until: int, days: int) -> slice:
+        """Срез последних {days} дней, заканчивая днем {until}"""
+        known = np.flatnonzero(self.timestamps >= 0)
+        end = int(np.searchsorted(self.timestamps[known], until, side="right"))
+        if end == 0:
+            return slice(0, 0)
+        stop = int(known[end - 1]) + 1
+        return slice(max(0, stop - days), stop)
+
+
+class GroupStats:
+    """Итоги группы за период"""
+
+    __slots__ = (
+        "group",
+        "rank",
+        "hours_off",
+        "hours_uncertain",
+        "longest_hours",
+        "longest_start",
+        "days",
+    )
+
+    def __init__(
+        self, group, rank, hours_off, hours_uncertain, longest_hours, longest_start, days
+    ):
+        self.group = group
+        self.rank = rank
+        self.hours_off = hours_off
+        self.hours_uncertain = hours_uncertain
+        self.longest_hours = longest_hours
+        self.longest_start = longest_start
+        self.days = days
+
+
+class OutageReport:
+    """Статистика отключений всех групп за период"""
+
+    __slots__ = (
+        "start",
+        "end",
+        "days",
+        "groups",
+        "_columns",
+        "_timestamps",
+        "_daily_off",
+        "_present",
+    )
+
+    def __init__(
+        self, start, end, days, groups, columns=(), timestamps=None, daily_off=None, present=None
+    ):
+        self.start: Optional[datetime] = start
+        self.end: Optional[datetime] = end
+        self.days: int = days
+        # Группы по убыванию часов без света
+        self.groups: List[GroupStats] = groups
+        # Данные для разбивки по дням (считается только по запросу)
+        self._columns = list(columns)
+        self._timestamps = timestamps
+        self._daily_off = daily_off
+        self._present = present
+
+    def get(self, group: str) -> Optional[GroupStats]:
+        return next((stats for stats in self.groups if stats.group == group), None)
+
+    def daily(self, group: str) -> List[Tuple[datetime, float]]:
+        """Часы без света группы по дням периода: [(день, часы), ...]"""
+        g = self._columns.index(group)
+        return [
+            (_to_datetime(int(timestamp)), float(self._daily_off[d, g]))
+            for d, timestamp in enumerate(self._timestamps)
+            if timestamp >= 0 and self._present[d, g]
+        ]
+
+
+class ScheduleHistory:
+    """
+    История расписания по дням (последняя известная версия каждого дня)
+    Пополняется при каждом новом снимке, результаты запросов кешируются до следующего изменения.
+    """
+
+    def __init__(self, max_days: int = MAX_DAYS):
+        self.max_days = max_days
+        self.days: Dict[int, Dict[str, DaySchedule]] = {}
+        self.version = 0
+        self._matrix: Optional[ScheduleMatrix] = None
+        self._reports: Dict[tuple, OutageReport] = {}
+
+    def add_days(self, days: Mapping[int, Mapping[str, DaySchedule]]) -> None:
+        """Добавляет или заменяет дни (например, из нового снимка или архива)"""
+        changed = False
+        for day, groups in days.items():
+            if self.days.get(day) != groups:
+                self.days[day] = dict(groups)
+                changed = True
+
+        if not changed:
+            return
+
+        for day in sorted(self.days)[: -self.max_days]:
+            del self.days[day]
+
+        self.version += 1
+        self._matrix = None
+        self._reports.clear()
+
+    def on_snapshot(self, snapshot: ScheduleSnapshot) -> None:
+        self.add_days(snapshot.days)
+
+    def matrix(self) -> Optional[ScheduleMatrix]:
+        if self._matrix is None and self.days:
+            self._matrix = ScheduleMatrix(self.days)
+        return self._matrix
+
+    def report(self, days: int, until: Optional[int] = None) -> Optional[OutageReport]:
+        """
+        Статистика за последние {days} дней
+
+        Args:
+            days: Длина периода в днях
+            until: Последний день периода (unix timestamp, по умолчанию сегодня)
+        """
+        snapshot = schedule_store.get()
+        if snapshot is not None:
+            # Снимок мог загрузиться раньше, чем история подписалась на обновления
+            self.add_days(snapshot.days)
+        if until is None:
+            until = snapshot.today if snapshot and snapshot.today else max(self.days, default=0)
+
+        key = (self.version, days, until)
+        if (report := self._reports.get(key)) is None:
+            matrix = self.matrix()
+            if matrix is None:
+                return None
+            report = self._reports[key] = _build_report(matrix, matrix.day_range(until, days))
+        return report
+
+
+def _build_report(matrix: ScheduleMatrix, days: slice) -> OutageReport:
+    off = matrix.off[days]
+    maybe = matrix.maybe[days]
+    present = matrix.present[days]
+    timestamps = matrix.timestamps[days]
+    day_count, group_count = present.shape
+
+    if not day_count or not group_count:
+        return OutageReport(None, None, 0, [])
+
+    daily_off = off.sum(axis=2) / 2  # (дни, группы)
+    hours_off = daily_off.sum(axis=0)
+    hours_uncertain = maybe.sum(axis=(0, 2)) / 2
+
+    # Самое долгое отключение: серии подряд идущих получасов без света (в том числе через полночь)
+    series = off.transpose(1, 0, 2).reshape(group_count, -1).astype(np.int8)
+    edges = np.diff(np.pad(series, ((0, 0), (1, 1))), axis=1)
+    starts = np.argwhere(edges == 1)
+    ends = np.argwhere(edges == -1)
+    lengths = ends[:, 1] - starts[:, 1]
+
+    longest = np.zeros(group_count, dtype=np.int64)
+    np.maximum.at(longest, starts[:, 0], lengths)
+    longest_slot = np.full(group_count, -1, dtype=np.int64)
+    if len(lengths):
+        best = np.flatnonzero(lengths == longest[starts[:, 0]])
+        groups_with_best, first = np.unique(starts[best, 0], return_index=True)
+        longest_slot[groups_with_best] = starts[best[first], 1]
+
+    order = np.argsort(-hours_off, kind="stable")
+
+    groups = []
+    for rank, g in enumerate(order, start=1):
+        slot = int(longest_slot[g])
+        longest_start = None
+        if slot >= 0:
+            day_start = _to_datetime(int(timestamps[slot // SLOTS]))
+            longest_start = day_start + timedelta(minutes=30 * (slot % SLOTS))
+        groups.append(
+            GroupStats(
+                group=matrix.groups[g],
+                rank=rank,
+                hours_off=float(hours_off[g]),
+                hours_uncertain=float(hours_uncertain[g]),
+                longest_hours=float(longest[g]) / 2,
+                longest_start=longest_start,
+                days=int(present[:, g].sum()),
+            )
+        )
+
+    known = timestamps[timestamps >= 0]
+    return OutageReport(
+        start=_to_datetime(int(known[0])),
+        end=_to_datetime(int(known[-1])),
+        days=day_count,
+        groups=groups,
+        columns=matrix.groups,
+        timestamps=timestamps,
+        daily_off=daily_off,
+        present=present,
+    )
+
+
+def _to_datetime(timestamp: int) -> datetime:
+    return datetime.fromtimestamp(timestamp, SOURCE_TZ)
+
+
+schedule_history = ScheduleHistory()
+# Каждый новый снимок пополняет историю
+schedule_store.subscribe(schedule_history.on_snapshot)
@@ -0,0 +1,173 @@
+"""
+Компактное представление расписания группы на день
+Сутки делятся на 48 получасовых слотов, слот i - это бит i в двух масках:
+
+    off  uncertain
+     0       0      свет есть
+     1       0      света нет
+     0       1      возможно отключение (maybe / mfirst / msecond)
+     1       1      нет данных (в расписании показывается как "Невідомо", в часы не входит)
+
+Сравнение двух расписаний - XOR масок, количество изменений - popcount.
+"""
+
+from typing import Dict, Iterator, List, Mapping, Tuple
+
+SLOTS = 48
+FULL = (1 << SLOTS) - 1
+
+ON = "on"
+OFF = "off"
+UNCERTAIN = "uncertain"
+
+# Статус часа -> биты (off, uncertain) для двух его получасов (бит 0 - первые 30 минут)
+_HOUR_BITS: Dict[str, Tuple[int, int]] = {
+    "yes": (0b00, 0b00),
+    "no": (0b11, 0b00),
+    "first": (0b01, 0b00),
+    "second": (0b10, 0b00),
+    "maybe": (0b00, 0b11),
+    "mfirst": (0b00, 0b11),
+    "msecond": (0b00, 0b11),
+}
+_UNKNOWN_BITS = (0b11, 0b11)
+
+
+class DaySchedule:
+    """Расписание группы на один день: две 48-битные маски"""
+
+    __slots__ = ("off", "uncertain")
+
+    def __init__(self, off: int = 0, uncertain: int = 0):
+        object.__setattr__(self, "off", off & FULL)
+        object.__setattr__(self, "uncertain", uncertain & FULL)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DaySchedule is immutable")
+
+    @classmethod
+    def from_hours(cls, hours: Mapping[str, str]) -> "DaySchedule":
+        """
+        Собирает маски из записи источника
+
+        Args:
+            hours: Словарь {"1": "yes", ..., "24": "no"} (час 1 - это 00:00-01:00)
+        """
+        off = uncertain = 0
+        for hour in range(24):
+            off_bits, uncertain_bits = _HOUR_BITS.get(hours.get(str(hour + 1)), _UNKNOWN_BITS)
+            off |= off_bits << (hour * 2)
+            uncertain |= uncertain_bits << (hour * 2)
+        return cls(off, uncertain)
+
+    # Маски состояний (по одному биту на слот)
+
+    @property
+    def on_mask(self) -> int:
+        return FULL & ~(self.off | self.uncertain)
+
+    @property
+    def off_mask(self) -> int:
+        return self.off & ~self.uncertain
+
+    @property
+    def maybe_mask(self) -> int:
+        return self.uncertain & ~self.off
+
+    @property
+    def unknown_mask(self) -> int:
+        return self.off & self.uncertain
+
+    # Часы по состояниям
+
+    @property
+    def hours_on(self) -> float:
+        return self.on_mask.bit_count() / 2
+
+    @property
+    def hours_off(self) -> float:
+        return self.off_mask.bit_count() / 2
+
+    @property
+    def hours_uncertain(self) -> float:
+        return self.maybe_mask.bit_count() / 2
+
+    def status(self, slot: int) -> str:
+        """Статус получаса для отображения (нет данных показывается как uncertain)"""
+        if self.uncertain >> slot & 1:
+            return UNCERTAIN
+        if self.off >> slot & 1:
+            return OFF
+        return ON
+
+    def periods(self) -> List[Tuple[str, int, int]]:
+        """
+        Объединяет соседние слоты с одинаковым статусом
+
+        Returns:
+            Список (статус, первый слот, слот после последнего)
+        """
+        off = self.off_mask
+        uncertain = self.uncertain
+        # Слоты, статус которых отличается от предыдущего
+        boundaries = ((off ^ (off << 1)) | (uncertain ^ (uncertain << 1))) & FULL & ~1
+
+        periods = []
+        start = 0
+        for slot in _iter_bits(boundaries):
+            periods.append((self.status(start), start, slot))
+            start = slot
+        periods.append((self.status(start), start, SLOTS))
+        return periods
+
+    def diff(self, other: "DaySchedule") -> int:
+        """Маска слотов, в которых расписания отличаются"""
+        return (self.off ^ other.off) | (self.uncertain ^ other.uncertain)
+
+    def changed_slots(self, other: "DaySchedule") -> int:
+        """Количество отличающихся получасов"""
+        return self.diff(other).bit_count()
+
+    def to_pair(self) -> Tuple[int, int]:
+        return self.off, self.uncertain
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DaySchedule):
+            return NotImplemented
+        return self.off == other.off and self.uncertain == other.uncertain
+
+    def __hash__(self) -> int:
+        return hash((self.off, self.uncertain))
+
+    def __repr__(self) -> str:
+        return f"<DaySchedule off={self.off:012x} uncertain={self.uncertain:012x}>"
+
+
+def _iter_bits(mask: int) -> Iterator[int]:
+    """Номера установленных битов по возрастанию"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def build_days(fact_data: Mapping) -> Dict[int, Dict[str, DaySchedule]]:
+    """
+    Переводит fact.data источника в маски
+
+    Одинаковые расписания (частый случай для соседних групп и дней)
+    хранятся одним объектом.
+
+    Returns:
+        Словарь {день (unix timestamp): {группа: DaySchedule}}
+    """
+    interned: Dict[Tuple[int, int], DaySchedule] = {}
+    days = {}
+    for day, groups in fact_data.items():
+        days[int(day)] = {}
+        for group_key, hours in groups.items():
+            if not hours:
+                continue
+            schedule = DaySchedule.from_hours(hours)
+            days[int(day)][group_key] = interned.setdefault(schedule.to_pair(), schedule)
+    return days
@@ -0,0 +1,148 @@
+"""
+Хранилище расписания в памяти процесса
+Файл kyiv-region.json читается один раз, дальше все запросы обслуживаются из снимка в памяти
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+
+import pytz
+
+from utils.logging import logger
+from utils.schedule_bits import DaySchedule, build_days
+
+# Часовой пояс, в котором источник указывает время обновления
+SOURCE_TZ = pytz.timezone("Europe/Kyiv")
+
+
+class ScheduleSnapshot:
+    """
+    Неизменяемый снимок расписания
+    Почасовые записи fact.data не хранятся - вместо них битовые маски (см. utils.schedule_bits)
+    """
+
+    __slots__ = ("data", "version", "days")
+
+    def __init__(self, data: Dict):
+        fact = data.get("fact", {})
+        object.__setattr__(self, "version", self.compute_version(data))
+        object.__setattr__(self, "days", MappingProxyType(build_days(fact.get("data", {}))))
+        object.__setattr__(
+            self,
+            "data",
+            MappingProxyType(
+                {**data, "fact": {key: value for key, value in fact.items() if key != "data"}}
+            ),
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ScheduleSnapshot is immutable")
+
+    @staticmethod
+    def compute_version(data: Dict) -> str:
+        """Хеш содержимого расписания (не зависит от форматирования файла)"""
+        raw = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @property
+    def fact(self) -> Mapping:
+        return self.data.get("fact", {})
+
+    @property
+    def preset(self) -> Mapping:
+        return self.data.get("preset", {})
+
+    @property
+    def today(self) -> Optional[int]:
+        return self.fact.get("today")
+
+    @property
+    def updated_at(self) -> Optional[datetime]:
+        """
+        Время последнего изменения расписания в источнике
+        (fact.update, например "17.10.2025 12:30", иначе lastUpdated)
+        """
+        try:
+            if update := self.fact.get("update"):
+                return SOURCE_TZ.localize(datetime.strptime(update, "%d.%m.%Y %H:%M"))
+            if last_updated := self.data.get("lastUpdated"):
+                return datetime.fromisoformat(last_updated.replace("Z", "+00:00"))
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    @property
+    def group_names(self) -> Mapping:
+        return self.preset.get("sch_names", {})
+
+    def get_group_day(
+        self, group_key: str, timestamp: Optional[int] = None
+    ) -> Optional[DaySchedule]:
+        """Расписание группы на день (по умолчанию на сегодня)"""
+        if timestamp is None:
+            timestamp = self.today
+        if not timestamp:
+            return None
+        return self.days.get(int(timestamp), {}).get(group_key)
+
+
+class ScheduleStore:
+    """
+    Процессный кеш расписания.
+    Новый снимок подменяется одной операцией присваивания, поэтому читатели
+    всегда видят либо старую, либо новую версию целиком.
+    """
+
+    def __init__(self, loader: Callable[[], Optional[Dict]] = None):
+        self._loader = loader
+        self._snapshot: Optional[ScheduleSnapshot] = None
+        self._loaded = False
+        self._listeners: List[Callable[[ScheduleSnapshot], None]] = []
+
+    def set_loader(self, loader: Callable[[], Optional[Dict]]) -> None:
+        """Функция для первоначальной загрузки расписания (например, из файла)"""
+        self._loader = loader
+
+    def subscribe(self, callback: Callable[[ScheduleSnapshot], None]) -> None:
+        """Регистрирует обработчик, который вызывается при появлении нового снимка"""
+        self._listeners.append(callback)
+
+    def get(self) -> Optional[ScheduleSnapshot]:
+        """Возвращает текущий снимок, при первом обращении загружает его"""
+        if not self._loaded and self._loader is not None:
+            self._loaded = True
+            if data := self._loader():
+                self.replace(data)
+        return self._snapshot
+
+    def replace(self, data: Dict) -> ScheduleSnapshot:
+        """
+        Подменяет текущий снимок новым
+
+        Returns:
+            Актуальный снимок (старый, если содержимое не изменилось)
+        """
+        snapshot = ScheduleSnapshot(data)
+        self._loaded = True
+
+        current = self._snapshot
+        if current is not None and current.version == snapshot.version:
+            return current
+
+        self._snapshot = snapshot
+        logger.log("GITHUB", f"Новая версия расписания в памяти: {snapshot.version[:12]}")
+
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Ошибка в обработчике обновления расписания: {e}")
+
+        return snapshot
+
+
+# Общий экземпляр хранилища для всего процесса
+schedule_store = ScheduleStore()